@@ -0,0 +1,94 @@
+import sys
+import time
+from collections import deque
+
+import degrees
+from util import QueueFrontier, IndexedQueueFrontier
+
+FRONTIERS = [
+    ("QueueFrontier", QueueFrontier),
+    ("IndexedQueueFrontier", IndexedQueueFrontier),
+]
+
+
+def main() -> None:
+    if len(sys.argv) not in (2, 4):
+        sys.exit("Usage: python benchmark.py directory [source target]")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    if len(sys.argv) == 4:
+        source = degrees.person_id_for_name(sys.argv[2])
+        target = degrees.person_id_for_name(sys.argv[3])
+        if source is None or target is None:
+            sys.exit("Person not found.")
+    else:
+        source, target = far_apart_pair()
+
+    print(f"Source: {degrees.people[source]['name']}")
+    print(f"Target: {degrees.people[target]['name']}")
+    for name, frontier_class in FRONTIERS:
+        run(f"bfs with {name}", lambda: degrees.breadth_first_search(
+            source, target, frontier_class
+        ))
+    for strategy in degrees.STRATEGIES:
+        run(strategy, lambda: degrees.shortest_path(source, target, strategy))
+
+    # Repeat the last strategy's query in reverse without clearing the caches
+    start = time.perf_counter()
+    degrees.shortest_path(target, source, strategy)
+    elapsed = time.perf_counter() - start
+    cache = degrees.path_cache
+    print(f"reverse query from path cache: {elapsed * 1000:.3f}ms "
+          f"({cache.hits} hits, {cache.misses} misses)")
+
+
+def run(label, search) -> None:
+    """
+    Times one search from cold caches and prints its path length
+    and expansion rate.
+    """
+    degrees.neighbor_cache.clear()
+    degrees.path_cache.clear()
+    start = time.perf_counter()
+    path = search()
+    elapsed = time.perf_counter() - start
+    expanded = degrees.stats["expanded"]
+    length = "not connected" if path is None else f"{len(path)} degrees"
+    print(f"{label}: {length}, {expanded} nodes in {elapsed:.3f}s "
+          f"({expanded / max(elapsed, 1e-9):,.0f} nodes/sec)")
+
+
+def far_apart_pair() -> tuple:
+    """
+    Returns a (source, target) pair of person_ids that are far apart,
+    found with a double sweep: the farthest person from an arbitrary
+    start, then the farthest person from that one.
+    """
+    start = next(iter(degrees.people))
+    source = farthest_from(start)
+    return source, farthest_from(source)
+
+
+def farthest_from(person_id) -> str:
+    """
+    Returns the last person_id reached by a breadth-first sweep
+    from person_id.
+    """
+    seen = {person_id}
+    queue = deque([person_id])
+    last = person_id
+    while queue:
+        last = queue.popleft()
+        for _, neighbor in degrees.neighbors_for_person(last):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return last
+
+
+if __name__ == "__main__":
+    main()
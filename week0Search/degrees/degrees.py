@@ -1,7 +1,8 @@
-import csv
 import sys
 
-from util import Node, QueueFrontier
+import ingest
+import snapshot
+from util import Node, IndexedQueueFrontier, LRUCache, MISSING, reverse_path
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,64 +13,94 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Search counters, reset at the start of every shortest_path call
+stats = {"expanded": 0}
 
-def load_data(directory) -> None:
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+# Most (movie_id, person_id) pairs kept across all cached co-star sets,
+# around 20 MB, since a single hub actor can have thousands of them
+NEIGHBOR_PAIRS = 200000
 
+# Bounded caches of co-star sets, sized by their number of pairs, and
+# of completed paths in both directions, keyed by (source, target,
+# strategy)
+neighbor_cache = LRUCache(maxsize=NEIGHBOR_PAIRS, sizeof=len)
+path_cache = LRUCache(maxsize=100000)
+
+
+def load_data(directory, processes=None) -> None:
+    """
+    Load data from CSV files into memory, parsing them in chunks
+    across processes worker processes (default: one per CPU).
+    """
+    neighbor_cache.clear()
+    path_cache.clear()
+
+    with ingest.open_pool(processes) as pool:
+
+        # Load people
+        for rows in ingest.read_csv(f"{directory}/people.csv",
+                                    ["id", "name", "birth"], pool):
+            for person_id, name, birth in rows:
+                people[person_id] = {
+                    "name": name,
+                    "birth": birth,
+                    "movies": set()
+                }
+                if name.lower() not in names:
+                    names[name.lower()] = {person_id}
+                else:
+                    names[name.lower()].add(person_id)
+
+        # Load movies
+        for rows in ingest.read_csv(f"{directory}/movies.csv",
+                                    ["id", "title", "year"], pool):
+            for movie_id, title, year in rows:
+                movies[movie_id] = {
+                    "title": title,
+                    "year": year,
+                    "stars": set()
+                }
+
+        # Load stars
+        for rows in ingest.read_csv(f"{directory}/stars.csv",
+                                    ["person_id", "movie_id"], pool):
+            for person_id, movie_id in rows:
+                try:
+                    people[person_id]["movies"].add(movie_id)
+                    movies[movie_id]["stars"].add(person_id)
+                except KeyError:
+                    pass
 
-def main() -> None:
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
 
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
+def main() -> None:
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [strategy]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    strategy = sys.argv[2] if len(sys.argv) == 3 else None
+    if strategy is not None and strategy not in STRATEGIES:
+        sys.exit(f"Unknown strategy. Choose from: {', '.join(STRATEGIES)}")
+
+    # Without a strategy, search the compact graph memory-mapped from its
+    # snapshot, which after the first run loads without parsing the CSVs;
+    # with one, load data from files into the dictionaries it searches
+    if strategy is None:
+        graph = snapshot.load_graph(directory)
+    else:
+        graph = None
+        load_data(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), graph)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), graph)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if graph is None:
+        path = shortest_path(source, target, strategy)
+    else:
+        path = graph.shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,25 +109,44 @@ def main() -> None:
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_details(path[i][1], graph)[0]
+            person2 = person_details(path[i + 1][1], graph)[0]
+            movie = movie_title(path[i + 1][0], graph)
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, strategy="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
-    that connect the source to the target.
+    that connect the source to the target, using the named
+    search strategy from STRATEGIES.
 
     If no possible path, returns None.
     """
+    path = path_cache.get((source, target, strategy), MISSING)
+    if path is MISSING:
+        path = STRATEGIES[strategy](source, target)
+        path_cache.put((source, target, strategy), path)
+        path_cache.put((target, source, strategy),
+                       reverse_path(source, path))
+    else:
+        # A cached answer expands nothing
+        stats["expanded"] = 0
+    return path
+
+
+def breadth_first_search(source, target, frontier_class=IndexedQueueFrontier):
+    """
+    Searches forward from source one node at a time until target
+    is reached, returning the path in shortest_path's format.
+    """
+    stats["expanded"] = 0
     if source == target:
         return []
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(start)
 
     # Keep track of an explored set
@@ -107,6 +157,11 @@ def shortest_path(source, target):
 
         # Remove a node from the frontier
         node = frontier.remove()
+        stats["expanded"] += 1
+
+        # Mark node as explored before expanding it, so it is not
+        # re-added to the frontier as its own co-star
+        explored.add(node.state)
 
         # Add neighbors to frontier
         for movie_id, person_id in neighbors_for_person(node.state):
@@ -130,26 +185,114 @@ def shortest_path(source, target):
                 # Add to frontier
                 frontier.add(child)
 
-        # Mark node as explored
-        explored.add(node.state)
+    return None
+
+
+def bidirectional_search(source, target):
+    """
+    Grows breadth-first layers from both source and target, always
+    expanding the smaller side, and joins the two halves where they
+    meet. Returns the path in shortest_path's format.
+    """
+    stats["expanded"] = 0
+    if source == target:
+        return []
+
+    # Map each reached person to (neighbor toward the root, movie_id)
+    # and to their distance from that side's root
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Expand the smaller layer to keep the number of expansions low
+        if len(forward_layer) <= len(backward_layer):
+            parents, depth, layer = forward, forward_depth, forward_layer
+            other, other_depth = backward, backward_depth
+        else:
+            parents, depth, layer = backward, backward_depth, backward_layer
+            other, other_depth = forward, forward_depth
+
+        next_layer = []
+        meeting = None
+        for person_id in layer:
+            stats["expanded"] += 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (person_id, movie_id)
+                depth[neighbor] = depth[person_id] + 1
+                next_layer.append(neighbor)
+
+                # Every meeting in this layer shares the same depth on this
+                # side, so keep the one closest to the other side's root
+                if neighbor in other and (
+                    meeting is None
+                    or other_depth[neighbor] < other_depth[meeting]
+                ):
+                    meeting = neighbor
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+        if layer is forward_layer:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
 
     return None
 
 
-def person_id_for_name(name) -> str:
+def join_paths(meeting, forward, backward) -> list:
+    """
+    Builds the source-to-target path through meeting from the
+    forward and backward parent maps of bidirectional_search.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        parent, movie_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        child, movie_id = backward[person_id]
+        path.append((movie_id, child))
+        person_id = child
+    return path
+
+
+# Search strategies selectable by name in shortest_path
+STRATEGIES = {
+    "bfs": breadth_first_search,
+    "bidirectional": bidirectional_search,
+}
+
+
+def person_id_for_name(name, graph=None) -> str:
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Looks the name up in graph, a CompactGraph, if given, and in the
+    loaded dictionaries otherwise.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if graph is None:
+        person_ids = list(names.get(name.lower(), set()))
+    else:
+        person_ids = graph.person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name, birth = person_details(person_id, graph)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -162,16 +305,42 @@ def person_id_for_name(name) -> str:
         return person_ids[0]
 
 
+def person_details(person_id, graph=None) -> tuple:
+    """
+    Returns (name, birth) for a person, from graph if given.
+    """
+    if graph is None:
+        return people[person_id]["name"], people[person_id]["birth"]
+    i = graph.person_index[person_id]
+    return graph.person_names[i], graph.person_births[i]
+
+
+def movie_title(movie_id, graph=None) -> str:
+    """
+    Returns the title of a movie, from graph if given.
+    """
+    if graph is None:
+        return movies[movie_id]["title"]
+    return graph.movie_titles[graph.movie_index[movie_id]]
+
+
 def neighbors_for_person(person_id) -> set:
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    The set is shared with neighbor_cache and must not be modified.
     """
+    neighbors = neighbor_cache.get(person_id)
+    if neighbors is not None:
+        return neighbors
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
         for pid in movies[movie_id]["stars"]:
             neighbors.add((movie_id, pid))
+    neighbor_cache.put(person_id, neighbors)
     return neighbors
 
 
@@ -0,0 +1,304 @@
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+from collections import deque
+
+import ingest
+from util import LRUCache, MISSING, reverse_path
+
+
+class CompactGraph():
+    """
+    Integer-indexed form of the degrees dataset.
+
+    Person and movie ids are interned to dense integers, and the
+    person/movie bipartite graph is stored as two compressed sparse
+    rows: person_movies[person_offsets[p]:person_offsets[p + 1]] are
+    the movies of person p, and movie_stars[movie_offsets[m]:
+    movie_offsets[m + 1]] are the stars of movie m.
+    """
+
+    def __init__(self):
+        # Interned ids and per-person / per-movie attributes
+        self.person_ids = []
+        self.person_index = {}
+        self.person_names = []
+        self.person_births = []
+        self.movie_ids = []
+        self.movie_index = {}
+        self.movie_titles = []
+        self.movie_years = []
+
+        # Maps lowercase names to a list of person indices
+        self.names = {}
+
+        # Compressed sparse row adjacency in both directions
+        self.person_offsets = array("q", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("q", [0])
+        self.movie_stars = array("i")
+
+        # Search counters, reset at the start of every shortest_path call
+        self.stats = {"expanded": 0}
+
+        # Completed paths in both directions, keyed by (source, target)
+        self.path_cache = LRUCache(maxsize=100000)
+
+    @classmethod
+    def load(cls, directory, processes=None):
+        """
+        Load data from CSV files into a new CompactGraph, parsing them
+        in chunks across processes worker processes (default: one per
+        CPU) and interning the parsed rows here.
+        """
+        graph = cls()
+        with ingest.open_pool(processes) as pool:
+
+            # Load people
+            for rows in ingest.read_csv(f"{directory}/people.csv",
+                                        ["id", "name", "birth"], pool):
+                for person_id, name, birth in rows:
+                    graph.add_person(person_id, name, birth)
+
+            # Load movies
+            for rows in ingest.read_csv(f"{directory}/movies.csv",
+                                        ["id", "title", "year"], pool):
+                for movie_id, title, year in rows:
+                    graph.add_movie(movie_id, title, year)
+
+            # Load stars as parallel arrays of interned edges
+            edge_people = array("i")
+            edge_movies = array("i")
+            person_index = graph.person_index
+            movie_index = graph.movie_index
+            for rows in ingest.read_csv(f"{directory}/stars.csv",
+                                        ["person_id", "movie_id"], pool):
+                for person_id, movie_id in rows:
+                    person = person_index.get(person_id)
+                    movie = movie_index.get(movie_id)
+                    if person is not None and movie is not None:
+                        edge_people.append(person)
+                        edge_movies.append(movie)
+
+        graph.build(edge_people, edge_movies)
+        return graph
+
+    def add_person(self, person_id, name, birth) -> int:
+        """
+        Interns a person and returns their index.
+        """
+        index = len(self.person_ids)
+        self.person_index[person_id] = index
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.names.setdefault(name.lower(), []).append(index)
+        return index
+
+    def add_movie(self, movie_id, title, year) -> int:
+        """
+        Interns a movie and returns its index.
+        """
+        index = len(self.movie_ids)
+        self.movie_index[movie_id] = index
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        return index
+
+    def build(self, edge_people, edge_movies) -> None:
+        """
+        Builds both CSR adjacencies from parallel arrays of
+        (person, movie) edges.
+        """
+        self.person_offsets, self.person_movies = csr(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_stars = csr(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+
+    def person_ids_for_name(self, name) -> list:
+        """
+        Returns the IMDB ids of every person with the given name,
+        ignoring case.
+        """
+        return [self.person_ids[i] for i in self.names.get(name.lower(), [])]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for k in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for star in movie_stars[movie_offsets[movie]:
+                                    movie_offsets[movie + 1]]:
+                yield movie, star
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, given as IMDB ids.
+
+        If no possible path, returns None.
+        """
+        path = self.path_cache.get((source, target), MISSING)
+        if path is MISSING:
+            path = self.search(source, target)
+            self.path_cache.put((source, target), path)
+            self.path_cache.put((target, source), reverse_path(source, path))
+        else:
+            # A cached answer expands nothing
+            self.stats["expanded"] = 0
+        return path
+
+    def search(self, source, target):
+        """
+        Breadth-first search behind shortest_path, bypassing the cache.
+        """
+        self.stats["expanded"] = 0
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if source == target:
+            return []
+
+        # parent_person[p] is -1 until p is reached
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+
+        queue = deque([source])
+        while queue:
+            person = queue.popleft()
+            self.stats["expanded"] += 1
+            for movie, star in self.neighbors(person):
+                if parent_person[star] != -1:
+                    continue
+                parent_person[star] = person
+                parent_movie[star] = movie
+                if star == target:
+                    return self.path_to(target, source,
+                                        parent_person, parent_movie)
+                queue.append(star)
+
+        return None
+
+    def single_source(self, source):
+        """
+        Runs one breadth-first search from source (an IMDB id) over the
+        whole graph. Returns (distance, parent_person, parent_movie)
+        arrays indexed by person, where distance is -1 for people who
+        cannot be reached and parents are -1 for the source and for
+        unreached people.
+        """
+        source = self.person_index[source]
+        distance = array("i", [-1]) * len(self.person_ids)
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        distance[source] = 0
+
+        queue = deque([source])
+        while queue:
+            person = queue.popleft()
+            for movie, star in self.neighbors(person):
+                if distance[star] != -1:
+                    continue
+                distance[star] = distance[person] + 1
+                parent_person[star] = person
+                parent_movie[star] = movie
+                queue.append(star)
+
+        return distance, parent_person, parent_movie
+
+    def path_to(self, target, source, parent_person, parent_movie) -> list:
+        """
+        Walks parent arrays back from target to source and returns
+        the path as (movie_id, person_id) pairs.
+        """
+        path = []
+        person = target
+        while person != source:
+            path.append((self.movie_ids[parent_movie[person]],
+                         self.person_ids[person]))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+
+def csr(rows, edge_rows, edge_columns):
+    """
+    Returns (offsets, columns) arrays for the edges given by the
+    parallel edge_rows and edge_columns arrays, using a counting sort.
+    """
+    offsets = array("q", [0]) * (rows + 1)
+    for row in edge_rows:
+        offsets[row + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    columns = array("i", [0]) * len(edge_columns)
+    cursor = offsets[:-1]
+    for row, column in zip(edge_rows, edge_columns):
+        columns[cursor[row]] = column
+        cursor[row] += 1
+    return offsets, columns
+
+
+def resident_memory() -> int:
+    """
+    Returns the current resident set size of this process in bytes,
+    or 0 where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(loader, directory, results) -> None:
+    """
+    Loads directory with loader in this process and reports the
+    load time and resident memory growth, taken while the loaded
+    graph is still alive, through results.
+    """
+    before = resident_memory()
+    start = time.perf_counter()
+    graph = loader(directory)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, resident_memory() - before))
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python graph.py directory [directory ...]")
+
+    import degrees
+
+    loaders = [("dicts", degrees.load_data), ("compact", CompactGraph.load)]
+    for directory in sys.argv[1:]:
+        print(f"{directory}:")
+        for name, loader in loaders:
+
+            # Measure each loader in a fresh process so memory is not shared
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=measure, args=(loader, directory, results)
+            )
+            process.start()
+            elapsed, memory = results.get()
+            process.join()
+            print(f"    {name}: loaded in {elapsed:.2f}s, "
+                  f"{memory / 2 ** 20:.1f} MiB resident")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import csv
+import io
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Bytes of CSV handed to a worker at a time
+CHUNK_SIZE = 16 * 2 ** 20
+
+
+@contextmanager
+def open_pool(processes=None):
+    """
+    Yields a process pool for read_csv, or None to parse in this
+    process when only one CPU is available or requested.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        yield None
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield pool
+
+
+def read_csv(path, columns, pool=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of tuples holding the named columns of every row of
+    a CSV file, in file order, one list per chunk.
+
+    The file is split into chunks of about chunk_size bytes at line
+    boundaries, so fields must not contain newlines. Chunks are parsed
+    by pool if given, and progress is reported on stderr.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()]))
+    indices = [header.index(column) for column in columns]
+
+    tasks = [(path, start, end, indices)
+             for start, end in chunk_ranges(path, chunk_size)]
+    progress = Progress(os.path.basename(path),
+                        sum(end - start for _, start, end, _ in tasks))
+    if pool is None:
+        results = map(parse_chunk, tasks)
+    else:
+        results = pool.imap(parse_chunk, tasks)
+    for (_, start, end, _), rows in zip(tasks, results):
+        progress.update(end - start, len(rows))
+        yield rows
+    progress.finish()
+
+
+def chunk_ranges(path, chunk_size) -> list:
+    """
+    Returns (start, end) byte ranges covering every line of a file
+    after its header, each ending at a line boundary.
+    """
+    ranges = []
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(task) -> list:
+    """
+    Parses one byte range of a CSV file into tuples of the selected
+    column indices.
+    """
+    path, start, end, indices = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return [tuple(row[i] for i in indices)
+            for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+
+class Progress():
+    """
+    Single-line progress and throughput readout for one file.
+    """
+
+    def __init__(self, name, total):
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def update(self, size, rows) -> None:
+        self.done += size
+        self.rows += rows
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        print(f"\rLoading {self.name}: "
+              f"{self.done / 2 ** 20:.1f}/{self.total / 2 ** 20:.1f} MiB, "
+              f"{self.rows:,} rows, {self.done / 2 ** 20 / elapsed:.1f} MiB/s",
+              end="", file=sys.stderr, flush=True)
+
+    def finish(self) -> None:
+        if self.total == 0:
+            self.update(0, 0)
+        print(file=sys.stderr)
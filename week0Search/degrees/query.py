@@ -0,0 +1,189 @@
+import collections
+import csv
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from snapshot import load_graph
+
+
+# Most recent latencies the server keeps for its percentiles
+LATENCY_WINDOW = 10000
+
+
+class LatencyRecorder():
+    """
+    Thread-safe collection of the most recent window query latencies
+    in seconds, or of all of them if window is None.
+    """
+
+    def __init__(self, window=None):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self, seconds) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentiles(self, *ps) -> list:
+        """
+        Returns the given percentiles of the recorded latencies, or 0
+        for each with no samples.
+        """
+        with self.lock:
+            samples = list(self.samples)
+        if len(samples) < 2:
+            return [samples[0] if samples else 0.0 for _ in ps]
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        return [cuts[p - 1] for p in ps]
+
+    def summary(self) -> dict:
+        with self.lock:
+            count = self.count
+        p50, p99 = self.percentiles(50, 99)
+        return {
+            "queries": count,
+            "p50_ms": p50 * 1000,
+            "p99_ms": p99 * 1000,
+        }
+
+
+def resolve(graph, name):
+    """
+    Returns (person_id, error) for a name or IMDB id. Ambiguous names
+    are an error, since batch and server queries cannot prompt.
+    """
+    if name in graph.person_index:
+        return name, None
+    person_ids = graph.person_ids_for_name(name)
+    if not person_ids:
+        return None, f"person not found: {name}"
+    if len(person_ids) > 1:
+        return None, f"ambiguous name {name}, use one of: {person_ids}"
+    return person_ids[0], None
+
+
+def answer(graph, source_name, target_name, latencies) -> dict:
+    """
+    Answers one query as a JSON-serializable dict and records
+    its latency.
+    """
+    start = time.perf_counter()
+    response = {"source": source_name, "target": target_name}
+    source, error = resolve(graph, source_name)
+    if error is None:
+        target, error = resolve(graph, target_name)
+    if error is not None:
+        response["error"] = error
+    else:
+        path = graph.shortest_path(source, target)
+        if path is None:
+            response["degrees"] = None
+        else:
+            response["degrees"] = len(path)
+            response["path"] = [
+                {
+                    "movie": graph.movie_titles[graph.movie_index[movie_id]],
+                    "person": graph.person_names[graph.person_index[person_id]],
+                }
+                for movie_id, person_id in path
+            ]
+    latencies.add(time.perf_counter() - start)
+    return response
+
+
+def batch(graph, lines) -> None:
+    """
+    Streams one JSON line per (source, target) CSV row of lines,
+    then prints latency percentiles to stderr.
+    """
+    latencies = LatencyRecorder()
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        if len(row) != 2:
+            print(json.dumps({"error": f"expected two names: {row}"}),
+                  flush=True)
+            continue
+        print(json.dumps(answer(graph, row[0], row[1], latencies)),
+              flush=True)
+    print(json.dumps(latencies.summary()), file=sys.stderr)
+
+
+def serve(graph, port) -> None:
+    """
+    Serves GET /path?source=...&target=... and GET /stats over HTTP
+    on localhost, keeping graph resident between requests.
+    """
+    latencies = LatencyRecorder(LATENCY_WINDOW)
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/path":
+                if "source" not in query or "target" not in query:
+                    return self.reply(400, {"error": "need source and target"})
+                self.reply(200, answer(graph, query["source"][0],
+                                       query["target"][0], latencies))
+            elif url.path == "/stats":
+                cache = graph.path_cache
+                self.reply(200, dict(latencies.summary(),
+                                     cache_hits=cache.hits,
+                                     cache_misses=cache.misses))
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"Serving on http://127.0.0.1:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(latencies.summary()), file=sys.stderr)
+
+
+def main() -> None:
+    usage = ("Usage: python query.py directory batch [file]\n"
+             "       python query.py directory serve [port]")
+    if len(sys.argv) not in (3, 4) or sys.argv[2] not in ("batch", "serve"):
+        sys.exit(usage)
+    directory, mode = sys.argv[1], sys.argv[2]
+
+    # Load data once and keep it resident for every query
+    print("Loading data...", file=sys.stderr)
+    graph = load_graph(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if mode == "batch":
+        if len(sys.argv) == 4:
+            with open(sys.argv[3], encoding="utf-8", newline="") as f:
+                batch(graph, f)
+        else:
+            batch(graph, sys.stdin)
+    else:
+        serve(graph, int(sys.argv[3]) if len(sys.argv) == 4 else 8000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import csv
+import multiprocessing
+import os
+import sys
+from collections import Counter
+
+from snapshot import load_graph
+
+# Graph loaded once per worker process by load_worker
+graph = None
+
+
+def load_worker(directory) -> None:
+    """
+    Pool initializer: maps the snapshot into this worker, so every
+    worker shares the same pages of the adjacency arrays.
+    """
+    global graph
+    graph = load_graph(directory)
+
+
+def histogram(source) -> tuple:
+    """
+    Returns (source, Counter) of degrees of separation from source
+    to every other person, counting unreachable people under None.
+    """
+    distance, _, _ = graph.single_source(source)
+    counts = Counter(distance)
+    counts[None] = counts.pop(-1, 0)
+    counts.pop(0, None)
+    return source, counts
+
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python separation.py directory output.csv "
+                 "[name ...]")
+    directory, output = sys.argv[1], sys.argv[2]
+
+    # Build or refresh the snapshot once before the workers map it
+    print("Loading data...")
+    main_graph = load_graph(directory)
+    print("Data loaded.")
+
+    # Named sources get their own rows; with none, use every person
+    sources = []
+    for name in sys.argv[3:]:
+        if name in main_graph.person_index:
+            sources.append(name)
+            continue
+        person_ids = main_graph.person_ids_for_name(name)
+        if len(person_ids) != 1:
+            sys.exit(f"Person not found or ambiguous: {name}")
+        sources.append(person_ids[0])
+    per_source = bool(sources)
+    if not sources:
+        sources = main_graph.person_ids
+
+    total = Counter()
+    rows = []
+    processes = os.cpu_count() or 1
+    chunksize = max(len(sources) // (processes * 16), 1)
+    with multiprocessing.Pool(processes, initializer=load_worker,
+                              initargs=(directory,)) as pool:
+        for done, (source, counts) in enumerate(
+            pool.imap_unordered(histogram, sources, chunksize), 1
+        ):
+            total.update(counts)
+            if per_source:
+                rows.extend((source, d, n) for d, n in counts.items())
+            if done % 1000 == 0 or done == len(sources):
+                print(f"{done}/{len(sources)} sources searched")
+
+    rows.extend(("*", d, n) for d, n in total.items())
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["source", "degrees", "count"])
+        for source, d, n in sorted(rows, key=sort_key):
+            writer.writerow([source, "unreachable" if d is None else d, n])
+
+
+def sort_key(row) -> tuple:
+    """
+    Orders histogram rows by source, then degrees, unreachable last.
+    """
+    source, d, _ = row
+    return source, d is None, d or 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from array import array
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP1"
+VERSION = 1
+SNAPSHOT = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# CompactGraph arrays stored in the snapshot, mapped without copying
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+# CompactGraph string tables stored in the snapshot as one pickle
+TABLES = ["person_ids", "person_names", "person_births",
+          "movie_ids", "movie_titles", "movie_years"]
+
+
+def load_graph(directory) -> CompactGraph:
+    """
+    Returns the CompactGraph for directory, memory-mapped from its
+    snapshot when the snapshot matches the source CSVs, and otherwise
+    parsed from the CSVs and written to a fresh snapshot.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    sources = fingerprint(directory)
+    graph = read_snapshot(path, sources, directory)
+    if graph is None:
+        graph = CompactGraph.load(directory)
+        try:
+            write_snapshot(path, graph, directory)
+        except OSError as error:
+            # The graph is already parsed, so an unwritable snapshot
+            # only costs the next run a reparse
+            print(f"Could not write snapshot: {error}", file=sys.stderr)
+    return graph
+
+
+def fingerprint(directory, hashes=False) -> dict:
+    """
+    Returns the size and modification time of each source CSV,
+    plus its SHA-256 digest if hashes is True.
+    """
+    sources = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        sources[name] = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if hashes:
+            sources[name]["sha256"] = file_hash(os.path.join(directory, name))
+    return sources
+
+
+def file_hash(path) -> str:
+    """
+    Returns the SHA-256 hex digest of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_fresh(stored, sources, directory) -> bool:
+    """
+    Checks whether stored source fingerprints still describe the CSVs.
+    A changed mtime alone is forgiven if the file contents hash the same,
+    and the stored mtime is updated so the file is not hashed again.
+    """
+    if stored.keys() != sources.keys():
+        return False
+    for name, current in sources.items():
+        old = stored[name]
+        if old["size"] != current["size"]:
+            return False
+        if old["mtime"] != current["mtime"]:
+            if old["sha256"] != file_hash(os.path.join(directory, name)):
+                return False
+            old["mtime"] = current["mtime"]
+    return True
+
+
+def rewrite_header(path, header, length) -> bool:
+    """
+    Overwrites the header of the snapshot at path in place, padded to
+    its existing length. Returns False if the new header does not fit.
+    """
+    encoded = json.dumps(header).encode("utf-8")
+    if len(encoded) > length:
+        return False
+    with open(path, "r+b") as f:
+        f.seek(len(MAGIC) + 8)
+        f.write(encoded + b" " * (length - len(encoded)))
+    return True
+
+
+def write_snapshot(path, graph, directory) -> None:
+    """
+    Writes graph to path atomically, tagged with the fingerprints
+    (including hashes) of the source CSVs in directory.
+    """
+    tables = pickle.dumps([getattr(graph, name) for name in TABLES],
+                          protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Lay out the arrays after the tables, each aligned to 8 bytes
+    layout = {}
+    offset = len(tables)
+    for name in ARRAYS:
+        buffer = getattr(graph, name)
+        offset += -offset % 8
+        layout[name] = [offset, len(buffer), buffer.typecode]
+        offset += len(buffer) * buffer.itemsize
+
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "sources": fingerprint(directory, hashes=True),
+        "tables": len(tables),
+        "arrays": layout,
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(tables)
+            written = len(tables)
+            for name in ARRAYS:
+                buffer = getattr(graph, name)
+                f.write(b"\0" * (layout[name][0] - written))
+                f.write(buffer)
+                written = layout[name][0] + len(buffer) * buffer.itemsize
+        os.replace(temporary, path)
+    except OSError:
+        # Leave no partial temporary file behind in the data directory
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path, sources, directory):
+    """
+    Returns a CompactGraph whose arrays are views into a read-only
+    memory map of path, or None if the snapshot is missing, from an
+    incompatible version, stale with respect to sources, or damaged.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # Any failure to read the snapshot means it must be rebuilt, so
+    # every error is treated as a stale snapshot
+    try:
+        if data[:len(MAGIC)] != MAGIC:
+            return None
+        (length,) = struct.unpack_from("<Q", data, len(MAGIC))
+        header = json.loads(data[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        stored = json.dumps(header["sources"])
+        if (header["version"] != VERSION
+                or header["byteorder"] != sys.byteorder
+                or not is_fresh(header["sources"], sources, directory)):
+            return None
+
+        # Keep the mtimes of CSVs whose contents did not change, or
+        # rebuild the snapshot if they do not fit in its header. A
+        # snapshot that cannot be written is still used as it is.
+        if json.dumps(header["sources"]) != stored:
+            try:
+                if not rewrite_header(path, header, length):
+                    return None
+            except OSError:
+                pass
+
+        start = len(MAGIC) + 8 + length
+        if start + header["tables"] > len(data):
+            return None
+        body = memoryview(data)[start:]
+        tables = pickle.loads(body[:header["tables"]])
+        if len(tables) != len(TABLES) or set(header["arrays"]) != set(ARRAYS):
+            return None
+
+        graph = CompactGraph()
+        for name, table in zip(TABLES, tables):
+            setattr(graph, name, table)
+        for name, (offset, count, typecode) in header["arrays"].items():
+            size = count * array(typecode).itemsize
+            if offset % 8 or start + offset + size > len(data):
+                return None
+            setattr(graph, name, body[offset:offset + size].cast(typecode))
+    except Exception:
+        return None
+
+    # Rebuild the lookup dictionaries from the interned id tables
+    graph.person_index = {
+        person_id: i for i, person_id in enumerate(graph.person_ids)
+    }
+    graph.movie_index = {
+        movie_id: i for i, movie_id in enumerate(graph.movie_ids)
+    }
+    for i, name in enumerate(graph.person_names):
+        graph.names.setdefault(name.lower(), []).append(i)
+    return graph
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python snapshot.py directory")
+    directory = sys.argv[1]
+
+    start = time.perf_counter()
+    CompactGraph.load(directory)
+    print(f"Parsed CSVs in {time.perf_counter() - start:.3f}s")
+
+    # The first call writes the snapshot if it is missing or stale
+    load_graph(directory)
+    start = time.perf_counter()
+    load_graph(directory)
+    print(f"Mapped snapshot in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+import threading
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +40,121 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class IndexedStackFrontier():
+    """
+    Drop-in replacement for StackFrontier backed by a deque, with a
+    companion count of states so contains_state is O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def _forget(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self._forget(self.frontier.pop())
+
+
+class IndexedQueueFrontier(IndexedStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self._forget(self.frontier.popleft())
+
+
+# Marks a cache miss where None is a valid cached value
+MISSING = object()
+
+
+def reverse_path(source, path):
+    """
+    Returns the target-to-source path for a source-to-target path of
+    (movie_id, person_id) pairs.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for _, person_id in path[:-1]]
+    return [(movie_id, person_id) for (movie_id, _), person_id
+            in zip(reversed(path), reversed(people))]
+
+
+class LRUCache():
+    """
+    Bounded, thread-safe mapping that evicts the least recently used
+    entries once their total size passes maxsize, counting hits and
+    misses. Each entry has size 1 unless sizeof is given, in which case
+    sizeof(value) is its size.
+    """
+
+    def __init__(self, maxsize=100000, sizeof=None):
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.size = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.measure(self.entries.pop(key))
+            self.entries[key] = value
+            self.size += self.measure(value)
+
+            # Always keep the newest entry, even if it alone is too large
+            while self.size > self.maxsize and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self.measure(evicted)
+
+    def measure(self, value):
+        return 1 if self.sizeof is None else self.sizeof(value)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
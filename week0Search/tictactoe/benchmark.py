@@ -0,0 +1,25 @@
+import time
+
+import tictactoe as ttt
+
+SEARCHES = [
+    ("full minimax", ttt.full_minimax),
+    ("alpha-beta minimax", ttt.alphabeta_minimax),
+    ("symmetry-reduced minimax", ttt.minimax),
+]
+
+
+def main() -> None:
+    board = ttt.initial_state()
+    print("Searching from the empty board")
+    for name, search in SEARCHES:
+        ttt.memo.clear()
+        start = time.perf_counter()
+        move = search(board)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: move {move}, {ttt.stats['nodes']:,} nodes "
+              f"in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
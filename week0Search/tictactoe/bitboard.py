@@ -0,0 +1,109 @@
+"""
+Bitboard Tic Tac Toe engine
+
+A position is a pair of 9-bit masks (x, o), where bit 3 * i + j is set
+when that player occupies cell (i, j).
+"""
+
+import tictactoe as ttt
+
+FULL = 0b111111111
+
+# Masks of the three cells in every row, column and diagonal
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Transposition table mapping (x, o) to the minimax value for X
+table = {}
+
+
+def encode(board) -> tuple:
+    """
+    Returns the (x, o) masks for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == ttt.X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == ttt.O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def has_line(mask) -> bool:
+    """
+    Returns True if mask covers a full row, column or diagonal.
+    """
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def x_to_move(x, o) -> bool:
+    """
+    Returns True if X has the next turn.
+    """
+    return bin(x).count("1") == bin(o).count("1")
+
+
+def moves(x, o):
+    """
+    Yields the bit of every empty cell.
+    """
+    empty = FULL & ~(x | o)
+    while empty:
+        bit = empty & -empty
+        yield bit
+        empty ^= bit
+
+
+def value(x, o) -> int:
+    """
+    Returns 1 if X wins with perfect play from (x, o), -1 if O wins,
+    and 0 for a draw, memoized in the transposition table.
+    """
+    key = (x, o)
+    if key in table:
+        return table[key]
+
+    if has_line(x):
+        result = 1
+    elif has_line(o):
+        result = -1
+    elif x | o == FULL:
+        result = 0
+    elif x_to_move(x, o):
+        result = max(value(x | bit, o) for bit in moves(x, o))
+    else:
+        result = min(value(x, o | bit) for bit in moves(x, o))
+
+    table[key] = result
+    return result
+
+
+def best_move(x, o):
+    """
+    Returns the bit of an optimal move for the player to move,
+    or None if the game is over.
+    """
+    if has_line(x) or has_line(o) or x | o == FULL:
+        return None
+    if x_to_move(x, o):
+        return max(moves(x, o), key=lambda bit: value(x | bit, o))
+    return min(moves(x, o), key=lambda bit: value(x, o | bit))
+
+
+def minimax(board) -> tuple:
+    """
+    Returns the optimal action (i, j) for the current player on the
+    board, like tictactoe.minimax, or None on a terminal board.
+    """
+    bit = best_move(*encode(board))
+    if bit is None:
+        return None
+    return divmod(bit.bit_length() - 1, 3)
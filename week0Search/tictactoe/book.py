@@ -0,0 +1,135 @@
+"""
+Perfect-play opening book for Tic Tac Toe
+
+Every board is indexed by its base-3 encoding (empty 0, X 1, O 2 per
+cell), and the book stores one byte per index: the optimal cell
+3 * i + j in the low four bits (NO_MOVE when none) and the minimax
+value plus one in the next two bits. Only reachable positions are
+filled in. Run `python book.py` to build the book file.
+"""
+
+import os
+import struct
+import sys
+import zlib
+
+import bitboard
+import tictactoe as ttt
+
+MAGIC = b"TTTBOOK1"
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+SIZE = 3 ** 9
+NO_MOVE = 0b1111
+UNREACHABLE = 0xFF
+
+
+def index(board) -> int:
+    """
+    Returns the base-3 index of a board.
+    """
+    n = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            n = n * 3 + (1 if cell == ttt.X else 2 if cell == ttt.O else 0)
+    return n
+
+
+def build() -> bytes:
+    """
+    Enumerates every reachable position with the bitboard engine and
+    returns the book entries.
+    """
+    entries = bytearray([UNREACHABLE]) * SIZE
+
+    def visit(x, o, n):
+        if entries[n] != UNREACHABLE:
+            return
+        bit = bitboard.best_move(x, o)
+        move = NO_MOVE if bit is None else bit.bit_length() - 1
+        entries[n] = move | (bitboard.value(x, o) + 1) << 4
+        if bit is None:
+            return
+        mark = 1 if bitboard.x_to_move(x, o) else 2
+        for bit in bitboard.moves(x, o):
+            cell = bit.bit_length() - 1
+            if mark == 1:
+                visit(x | bit, o, n + 3 ** cell)
+            else:
+                visit(x, o | bit, n + 2 * 3 ** cell)
+
+    visit(0, 0, 0)
+    return bytes(entries)
+
+
+def save(entries, path=PATH) -> None:
+    """
+    Writes book entries with a magic header and CRC-32 checksum.
+    """
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", zlib.crc32(entries)))
+        f.write(entries)
+
+
+def load(path=PATH):
+    """
+    Returns the book entries stored at path, or None if the file is
+    missing or corrupt.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = len(MAGIC) + 4
+    if len(data) != header + SIZE or data[:len(MAGIC)] != MAGIC:
+        return None
+    (checksum,) = struct.unpack_from("<I", data, len(MAGIC))
+    entries = data[header:]
+    if zlib.crc32(entries) != checksum:
+        return None
+    return entries
+
+
+# Loaded once at startup; None means every move falls back to search
+entries = load()
+
+
+def lookup(board):
+    """
+    Returns (action, value) for a board from the book, or None if the
+    book is not loaded or does not contain the board.
+    """
+    if entries is None:
+        return None
+    entry = entries[index(board)]
+    if entry == UNREACHABLE:
+        return None
+    move = entry & 0b1111
+    action = None if move == NO_MOVE else divmod(move, 3)
+    return action, (entry >> 4) - 1
+
+
+def minimax(board) -> tuple:
+    """
+    Returns the optimal action for the current player on the board,
+    from the book when possible and by search otherwise.
+    """
+    found = lookup(board)
+    if found is not None:
+        return found[0]
+    return bitboard.minimax(board)
+
+
+def main() -> None:
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else PATH
+    table = build()
+    save(table, path)
+    positions = sum(entry != UNREACHABLE for entry in table)
+    print(f"Wrote {positions} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+m,n,k-game player
+
+Tic Tac Toe generalized to a board of any height and width, won by
+the first player to place k marks in a row, column or diagonal.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, large enough to dominate any heuristic value
+WIN = 10 ** 15
+
+# Boards with more cells than this only search cells next to existing marks
+FULL_WIDTH_CELLS = 16
+
+# Directions of the lines through a cell: row, column and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the move's time budget runs out."""
+
+
+class MNKGame():
+    """
+    Rules and a time-limited player for an m,n,k-game
+    """
+
+    def __init__(self, height=3, width=3, k=3) -> None:
+        if k > max(height, width):
+            raise ValueError("win length does not fit on the board")
+        self.height = height
+        self.width = width
+        self.k = k
+
+        # Every run of k cells that would win the game if filled by one player
+        self.windows = []
+        for i in range(height):
+            for j in range(width):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < height and 0 <= end_j < width:
+                        self.windows.append(
+                            [(i + di * n, j + dj * n) for n in range(k)]
+                        )
+
+        # Search counters, reset at the start of every minimax call
+        self.stats = {"nodes": 0, "depth": 0}
+
+    def initial_state(self) -> list:
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.width for _ in range(self.height)]
+
+    def player(self, board) -> str:
+        """
+        Returns player who has the next turn on a board.
+        """
+        num_X = sum(row.count(X) for row in board)
+        num_O = sum(row.count(O) for row in board)
+        return O if num_X > num_O else X
+
+    def actions(self, board) -> set:
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j)
+                for i in range(self.height)
+                for j in range(self.width)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action) -> list:
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.height and 0 <= j < self.width):
+            raise Exception("Invalid Action: Out of bounds")
+        if board[i][j] != EMPTY:
+            raise Exception("Invalid Action: Position already taken")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board) -> str:
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for window in self.windows:
+            i, j = window[0]
+            mark = board[i][j]
+            if mark != EMPTY and all(board[a][b] == mark for a, b in window):
+                return mark
+        return None
+
+    def terminal(self, board) -> bool:
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board) -> int:
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        winner = self.winner(board)
+        return 1 if winner == X else -1 if winner == O else 0
+
+    def wins_through(self, board, cell) -> bool:
+        """
+        Returns True if the mark on cell is part of k in a row.
+        """
+        i, j = cell
+        mark = board[i][j]
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                a, b = i + sign * di, j + sign * dj
+                while (0 <= a < self.height and 0 <= b < self.width
+                       and board[a][b] == mark):
+                    count += 1
+                    a, b = a + sign * di, b + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def evaluate(self, board) -> int:
+        """
+        Returns a heuristic score for X: every window still open to one
+        player counts 10 ** (marks in it) toward that player.
+        """
+        score = 0
+        for window in self.windows:
+            num_X = num_O = 0
+            for i, j in window:
+                if board[i][j] == X:
+                    num_X += 1
+                elif board[i][j] == O:
+                    num_O += 1
+            if num_X and not num_O:
+                score += 10 ** num_X
+            elif num_O and not num_X:
+                score -= 10 ** num_O
+        return score
+
+    def candidates(self, board) -> list:
+        """
+        Returns the empty cells worth searching, nearest the centre
+        first. On boards larger than FULL_WIDTH_CELLS only cells next to
+        an existing mark are returned, or the centre on an empty board.
+        """
+        center = ((self.height - 1) / 2, (self.width - 1) / 2)
+        if self.height * self.width <= FULL_WIDTH_CELLS:
+            cells = self.actions(board)
+        else:
+            cells = set()
+            for i in range(self.height):
+                for j in range(self.width):
+                    if board[i][j] == EMPTY:
+                        continue
+                    for a in range(max(i - 1, 0), min(i + 2, self.height)):
+                        for b in range(max(j - 1, 0), min(j + 2, self.width)):
+                            if board[a][b] == EMPTY:
+                                cells.add((a, b))
+            if not cells:
+                return [(self.height // 2, self.width // 2)]
+        return sorted(cells, key=lambda c: (abs(c[0] - center[0])
+                                            + abs(c[1] - center[1]), c))
+
+    def minimax(self, board, time_limit=1.0) -> tuple:
+        """
+        Returns the best action found for the current player within
+        time_limit seconds, using iterative-deepening alpha-beta search
+        with the heuristic evaluation at the depth limit.
+        """
+        self.stats["nodes"] = 0
+        self.stats["depth"] = 0
+        if self.terminal(board):
+            return None
+
+        deadline = time.perf_counter() + time_limit
+        board = [row[:] for row in board]
+        mark = self.player(board)
+        empty = sum(row.count(EMPTY) for row in board)
+        moves = self.candidates(board)
+        best_action = moves[0]
+        if len(moves) == 1:
+            return best_action
+
+        for depth in range(1, empty + 1):
+            try:
+                value, action = self.search_root(board, mark, moves,
+                                                 depth, deadline)
+            except SearchTimeout:
+                break
+            best_action = action
+            self.stats["depth"] = depth
+
+            # Search the previous best move first at the next depth
+            moves.remove(action)
+            moves.insert(0, action)
+
+            # Stop once a forced win or loss has been proven
+            if abs(value) >= WIN:
+                break
+        return best_action
+
+    def search_root(self, board, mark, moves, depth, deadline) -> tuple:
+        """
+        Returns (value, action) for the best root move at depth.
+        """
+        maximizing = mark == X
+        alpha, beta = -math.inf, math.inf
+        best_action = None
+        for action in moves:
+            value = self.alphabeta(board, action, mark, depth - 1,
+                                   alpha, beta, deadline)
+            if maximizing and (best_action is None or value > alpha):
+                alpha, best_action = value, action
+            elif not maximizing and (best_action is None or value < beta):
+                beta, best_action = value, action
+        return (alpha if maximizing else beta), best_action
+
+    def alphabeta(self, board, action, mark, depth, alpha, beta, deadline):
+        """
+        Plays mark at action, returns the alpha-beta value of the
+        resulting position searched to depth, and undoes the move.
+        """
+        self.stats["nodes"] += 1
+        if time.perf_counter() > deadline:
+            raise SearchTimeout
+
+        i, j = action
+        board[i][j] = mark
+        try:
+            # Prefer quicker wins and slower losses
+            if self.wins_through(board, action):
+                return (WIN + depth) if mark == X else -(WIN + depth)
+            if not any(EMPTY in row for row in board):
+                return 0
+            if depth == 0:
+                return self.evaluate(board)
+            moves = self.candidates(board)
+
+            opponent = O if mark == X else X
+            if opponent == X:
+                v = -math.inf
+                for move in moves:
+                    v = max(v, self.alphabeta(board, move, opponent,
+                                              depth - 1, alpha, beta,
+                                              deadline))
+                    if v >= beta:
+                        return v
+                    alpha = max(alpha, v)
+            else:
+                v = math.inf
+                for move in moves:
+                    v = min(v, self.alphabeta(board, move, opponent,
+                                              depth - 1, alpha, beta,
+                                              deadline))
+                    if v <= alpha:
+                        return v
+                    beta = min(beta, v)
+            return v
+        finally:
+            board[i][j] = EMPTY
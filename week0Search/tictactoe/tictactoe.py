@@ -9,6 +9,38 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# Cells in the order alpha-beta search tries them: center, corners, edges
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Cell indices 3 * i + j of MOVE_ORDER
+MOVE_ORDER_INDICES = [3 * i + j for i, j in MOVE_ORDER]
+
+# Cell indices of every row, column and diagonal
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+# The 8 rotations and reflections of the board, each as the original
+# cell index that lands on every cell index of the transformed board
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+]
+
+# Memo table mapping canonical positions to (value, best cell index)
+memo = {}
+
+# Search counters, reset at the start of every minimax call
+stats = {"nodes": 0}
+
 
 def initial_state() -> list:
     """
@@ -131,9 +163,152 @@ def utility(board) -> int:
 
 def minimax(board) -> tuple:
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board,
+    searching each position only once up to rotation and reflection.
     """
-    # raise NotImplementedError
+    stats["nodes"] = 0
+    if terminal(board):
+        return None
+    cells = tuple(board[i][j] for i in range(3) for j in range(3))
+    position, symmetry = canonical(cells)
+    _, best = solve(position)
+
+    # Map the move from the canonical orientation back to the board's
+    return divmod(symmetry[best], 3)
+
+
+def canonical(cells) -> tuple:
+    """
+    Returns (position, symmetry): the smallest of the 8 symmetric
+    images of a 9-cell tuple, and the symmetry that produced it.
+    """
+    return canonical_codes(
+        tuple(0 if c == EMPTY else 1 if c == X else 2 for c in cells)
+    )
+
+
+def solve(position) -> tuple:
+    """
+    Returns (value, best cell index) for a canonical position, where
+    value is the minimax utility and the index is None when the game
+    is over. Children that are symmetric to each other are searched
+    once, and results are kept in memo.
+    """
+    if position in memo:
+        return memo[position]
+    stats["nodes"] += 1
+
+    for a, b, c in LINES:
+        if position[a] != 0 and position[a] == position[b] == position[c]:
+            memo[position] = (1 if position[a] == 1 else -1), None
+            return memo[position]
+    if 0 not in position:
+        memo[position] = 0, None
+        return memo[position]
+
+    mark = 1 if position.count(1) == position.count(2) else 2
+    sign = 1 if mark == 1 else -1
+    seen = set()
+    best_value, best = None, None
+    for k in MOVE_ORDER_INDICES:
+        if position[k] != 0:
+            continue
+        child, _ = canonical_codes(position[:k] + (mark,) + position[k + 1:])
+        if child in seen:
+            continue
+        seen.add(child)
+        value, _ = solve(child)
+        if best_value is None or sign * value > sign * best_value:
+            best_value, best = value, k
+
+            # Stop on a proven win
+            if value == sign:
+                break
+
+    memo[position] = best_value, best
+    return memo[position]
+
+
+def canonical_codes(codes) -> tuple:
+    """
+    Returns (position, symmetry) like canonical, for a tuple of cell
+    codes (0 empty, 1 X, 2 O).
+    """
+    return min((tuple(codes[k] for k in symmetry), symmetry)
+               for symmetry in SYMMETRIES)
+
+
+def alphabeta_minimax(board) -> tuple:
+    """
+    Returns the optimal action for the current player on the board,
+    using alpha-beta search with move ordering.
+    """
+    stats["nodes"] = 0
+    if terminal(board):
+        return None
+    current_player = player(board)
+    best_action = None
+    alpha, beta = -math.inf, math.inf
+    for action in ordered_actions(board):
+        if current_player == X:
+            value = ab_min_value(result(board, action), alpha, beta)
+            if best_action is None or value > alpha:
+                alpha = value
+                best_action = action
+            # Stop on a proven win
+            if alpha == 1:
+                break
+        else:
+            value = ab_max_value(result(board, action), alpha, beta)
+            if best_action is None or value < beta:
+                beta = value
+                best_action = action
+            if beta == -1:
+                break
+    return best_action
+
+
+def ordered_actions(board) -> list:
+    """
+    Returns the available actions on the board in MOVE_ORDER.
+    """
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] == EMPTY]
+
+
+def ab_max_value(board, alpha, beta):
+    stats["nodes"] += 1
+    if terminal(board):
+        return utility(board)
+
+    v = -math.inf
+    for action in ordered_actions(board):
+        v = max(v, ab_min_value(result(board, action), alpha, beta))
+        if v >= beta:
+            return v
+        alpha = max(alpha, v)
+    return v
+
+
+def ab_min_value(board, alpha, beta):
+    stats["nodes"] += 1
+    if terminal(board):
+        return utility(board)
+
+    v = math.inf
+    for action in ordered_actions(board):
+        v = min(v, ab_max_value(result(board, action), alpha, beta))
+        if v <= alpha:
+            return v
+        beta = min(beta, v)
+    return v
+
+
+def full_minimax(board) -> tuple:
+    """
+    Returns the optimal action for the current player on the board,
+    searching the full game tree without pruning.
+    """
+    stats["nodes"] = 0
     if terminal(board):
         return None
     current_player = player(board)
@@ -156,6 +331,7 @@ def minimax(board) -> tuple:
 
 
 def max_value(board):
+    stats["nodes"] += 1
     if terminal(board):
         return utility(board)
     
@@ -166,10 +342,11 @@ def max_value(board):
 
 
 def min_value(board):
+    stats["nodes"] += 1
     if terminal(board):
         return utility(board)
     
     v = math.inf
     for action in actions(board):
         v = min(v, max_value(result(board, action)))
-    return v
\ No newline at end of file
+    return v
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+import bitboard
+import book
+import tictactoe as ttt
+
+# Move functions that can play as "ai"; only the tictactoe searches
+# count visited nodes
+ENGINES = {
+    "minimax": ttt.minimax,
+    "alphabeta": ttt.alphabeta_minimax,
+    "bitboard": bitboard.minimax,
+    "book": book.minimax,
+}
+
+# Pairings played in every tournament, as (X, O)
+MATCHUPS = [("ai", "ai"), ("ai", "random"), ("random", "ai")]
+
+
+def play_game(task) -> dict:
+    """
+    Plays one game through the tictactoe API and returns its winner
+    and the latency and node count of every AI move.
+    """
+    engine, (x_player, o_player), seed = task
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+
+    # Start every game with an empty position table, so that node counts
+    # measure this game's search rather than positions solved in
+    # earlier games played by the same worker
+    ttt.memo.clear()
+    latencies = []
+    nodes = []
+    while not ttt.terminal(board):
+        kind = x_player if ttt.player(board) == ttt.X else o_player
+        if kind == "random":
+            action = rng.choice(sorted(ttt.actions(board)))
+        else:
+            start = time.perf_counter()
+            action = ENGINES[engine](board)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(ttt.stats["nodes"])
+        board = ttt.result(board, action)
+    return {
+        "matchup": f"{x_player}-vs-{o_player}",
+        "winner": ttt.winner(board) or "tie",
+        "latencies": latencies,
+        "nodes": nodes,
+    }
+
+
+def percentiles(samples) -> dict:
+    """
+    Returns p50/p90/p99 of samples, in milliseconds.
+    """
+    if len(samples) < 2:
+        return {f"p{p}_ms": sample * 1000
+                for p in (50, 90, 99) for sample in samples}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {f"p{p}_ms": cuts[p - 1] * 1000 for p in (50, 90, 99)}
+
+
+def main() -> None:
+    if len(sys.argv) not in (3, 4) or sys.argv[2] not in ENGINES:
+        sys.exit("Usage: python tournament.py games "
+                 f"{{{','.join(ENGINES)}}} [output.json]")
+    games = int(sys.argv[1])
+    engine = sys.argv[2]
+    output = sys.argv[3] if len(sys.argv) == 4 else None
+
+    # Seed every game from its number so runs are reproducible
+    tasks = [(engine, MATCHUPS[n % len(MATCHUPS)], n) for n in range(games)]
+
+    processes = os.cpu_count() or 1
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        games_played = pool.map(play_game, tasks,
+                                chunksize=max(games // (processes * 8), 1))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    latencies = []
+    nodes = []
+    for game in games_played:
+        results.setdefault(game["matchup"], Counter())[game["winner"]] += 1
+        latencies.extend(game["latencies"])
+        nodes.extend(game["nodes"])
+
+    report = {
+        "engine": engine,
+        "games": games,
+        "processes": processes,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed,
+        "moves": len(latencies),
+        "move_latency": percentiles(latencies),
+        "nodes_per_move": (sum(nodes) / len(nodes)
+                           if engine in ("minimax", "alphabeta") and nodes
+                           else None),
+        "results": {matchup: dict(counts)
+                    for matchup, counts in results.items()},
+    }
+
+    print(f"{games} games with {engine} in {elapsed:.2f}s "
+          f"({report['games_per_sec']:.1f} games/sec)")
+    print("Move latency: " + ", ".join(
+        f"{name} {value:.3f}" for name, value in report["move_latency"].items()
+    ))
+    if report["nodes_per_move"] is not None:
+        print(f"Nodes per move: {report['nodes_per_move']:.1f}")
+    for matchup, counts in report["results"].items():
+        print(f"  {matchup}: " + ", ".join(
+            f"{winner} {count}" for winner, count in sorted(counts.items())
+        ))
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import random
+import sys
+import time
+
+from logic import *
+import sat
+
+# Entailment checkers as (name, function, most symbols to try it on),
+# since the ones that enumerate every complete model take too long on
+# large puzzles
+CHECKERS = [
+    ("full model_check", full_model_check, 16),
+    ("model_check", model_check, None),
+    ("bitwise", model_check_bitwise, 20),
+    ("batched", model_check_batched, 26),
+    ("sat", sat.entails, None),
+]
+
+
+def generate(characters, seed) -> tuple:
+    """
+    Returns (knowledge, symbols) for a random knights-and-knaves puzzle
+    in which every character makes one statement about the others. The
+    statements are chosen to be consistent with a hidden assignment of
+    roles, so the puzzle always has a solution.
+    """
+    rng = random.Random(seed)
+    names = [chr(ord("A") + n) if n < 26 else f"P{n}"
+             for n in range(characters)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    roles = [rng.random() < 0.5 for _ in names]
+
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+        knowledge.add(And(Or(knight, knave), Not(And(knight, knave))))
+
+    for n in range(characters):
+        others = [m for m in range(characters) if m != n] or [n]
+        a, b = rng.choice(others), rng.choice(others)
+        kind = rng.randrange(4)
+        if kind == 0:
+            statement, truth = knights[a], roles[a]
+        elif kind == 1:
+            statement, truth = knaves[a], not roles[a]
+        elif kind == 2:
+            statement = Biconditional(knights[a], knights[b])
+            truth = roles[a] == roles[b]
+        else:
+            statement = Or(knaves[a], knaves[b])
+            truth = not (roles[a] and roles[b])
+
+        # Knights tell the truth and knaves lie
+        if truth != roles[n]:
+            statement = Not(statement)
+        knowledge.add(Implication(knights[n], statement))
+        knowledge.add(Implication(knaves[n], Not(statement)))
+
+    return knowledge, [s for pair in zip(knights, knaves) for s in pair]
+
+
+def main() -> None:
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [characters] [seed]")
+    characters = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    knowledge, symbols = generate(characters, seed)
+    print(f"{characters} characters, {len(symbols)} symbols, "
+          f"{len(symbols)} queries")
+    answers = {}
+    for name, check, limit in CHECKERS:
+        if limit is not None and len(symbols) > limit:
+            print(f"{name}: skipped")
+            continue
+        model_sets.clear()
+        start = time.perf_counter()
+        answers[name] = [check(knowledge, symbol) for symbol in symbols]
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {sum(answers[name])} entailed in {elapsed:.3f}s")
+
+    if len({tuple(answer) for answer in answers.values()}) != 1:
+        sys.exit("Checkers disagree")
+
+
+if __name__ == "__main__":
+    main()
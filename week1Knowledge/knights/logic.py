@@ -1,12 +1,36 @@
+import collections
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Interned nodes are shared and never change, so they compute their
+    # hash and symbol set once; other nodes may be changed through
+    # And.add, and recompute them on every call
+    __slots__ = ("cached_hash", "cached_symbols", "interned", "__weakref__")
+
+    def __init__(self):
+        self.cached_hash = None
+        self.cached_symbols = None
+        self.interned = False
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave some
+        symbols unassigned: returns True or False if the assigned
+        symbols decide the sentence, or None if they do not.
+        """
+        raise Exception("nothing to evaluate")
+
+    def occurrences(self, counts):
+        """Adds the number of times each symbol appears to counts."""
+        pass
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -15,6 +39,15 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def compile(self, index, full):
+        """
+        Returns a function that evaluates the sentence bitwise: it takes
+        a list of integer masks, one per symbol position in index, and
+        returns the mask of bits where the sentence is true. full is the
+        mask with every bit in use set.
+        """
+        raise Exception("nothing to compile")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -43,15 +76,19 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        super().__init__()
         self.name = name
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self.cached_hash is None:
+            self.cached_hash = hash(("symbol", self.name))
+        return self.cached_hash
 
     def __repr__(self):
         return self.name
@@ -62,23 +99,42 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def partial(self, model):
+        return model.get(self.name)
+
+    def occurrences(self, counts):
+        counts[self.name] += 1
+
     def formula(self):
         return self.name
 
     def symbols(self):
         return {self.name}
 
+    def compile(self, index, full):
+        position = index[self.name]
+        return lambda values: values[position]
+
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        super().__init__()
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self.cached_hash is None:
+            value = hash(("not", hash(self.operand)))
+            if not self.interned:
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +142,51 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def partial(self, model):
+        value = self.operand.partial(model)
+        return None if value is None else not value
+
+    def occurrences(self, counts):
+        self.operand.occurrences(counts)
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
     def symbols(self):
-        return self.operand.symbols()
+        if self.cached_symbols is None:
+            symbols = self.operand.symbols()
+            if not self.interned:
+                return symbols
+            self.cached_symbols = symbols
+        return set(self.cached_symbols)
+
+    def compile(self, index, full):
+        operand = self.operand.compile(index, full)
+        return lambda values: full ^ operand(values)
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        super().__init__()
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And)
+                                 and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self.cached_hash is None:
+            value = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+            if not self.interned:
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,12 +195,28 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        if self.interned:
+            raise Exception("cannot add to an interned sentence")
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def occurrences(self, counts):
+        for conjunct in self.conjuncts:
+            conjunct.occurrences(counts)
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -127,22 +224,51 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        if self.cached_symbols is None:
+            symbols = set.union(
+                *[conjunct.symbols() for conjunct in self.conjuncts]
+            )
+            if not self.interned:
+                return symbols
+            self.cached_symbols = symbols
+        return set(self.cached_symbols)
+
+    def compile(self, index, full):
+        conjuncts = [conjunct.compile(index, full)
+                     for conjunct in self.conjuncts]
+
+        def evaluate(values):
+            result = full
+            for conjunct in conjuncts:
+                result &= conjunct(values)
+                if not result:
+                    break
+            return result
+        return evaluate
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        super().__init__()
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or)
+                                 and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self.cached_hash is None:
+            value = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+            if not self.interned:
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,6 +277,20 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def occurrences(self, counts):
+        for disjunct in self.disjuncts:
+            disjunct.occurrences(counts)
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -158,23 +298,53 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        if self.cached_symbols is None:
+            symbols = set.union(
+                *[disjunct.symbols() for disjunct in self.disjuncts]
+            )
+            if not self.interned:
+                return symbols
+            self.cached_symbols = symbols
+        return set(self.cached_symbols)
+
+    def compile(self, index, full):
+        disjuncts = [disjunct.compile(index, full)
+                     for disjunct in self.disjuncts]
+
+        def evaluate(values):
+            result = 0
+            for disjunct in disjuncts:
+                result |= disjunct(values)
+                if result == full:
+                    break
+            return result
+        return evaluate
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        super().__init__()
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self.cached_hash is None:
+            value = hash(
+                ("implies", hash(self.antecedent), hash(self.consequent))
+            )
+            if not self.interned:
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,38 +353,84 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def partial(self, model):
+        antecedent = self.antecedent.partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
+    def occurrences(self, counts):
+        self.antecedent.occurrences(counts)
+        self.consequent.occurrences(counts)
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        if self.cached_symbols is None:
+            symbols = set.union(self.antecedent.symbols(),
+                                self.consequent.symbols())
+            if not self.interned:
+                return symbols
+            self.cached_symbols = symbols
+        return set(self.cached_symbols)
+
+    def compile(self, index, full):
+        antecedent = self.antecedent.compile(index, full)
+        consequent = self.consequent.compile(index, full)
+        return lambda values: (full ^ antecedent(values)) | consequent(values)
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        super().__init__()
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self.cached_hash is None:
+            value = hash(
+                ("biconditional", hash(self.left), hash(self.right))
+            )
+            if not self.interned:
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
+
+    def partial(self, model):
+        left = self.left.partial(model)
+        if left is None:
+            return None
+        right = self.right.partial(model)
+        if right is None:
+            return None
+        return left == right
+
+    def occurrences(self, counts):
+        self.left.occurrences(counts)
+        self.right.occurrences(counts)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
@@ -222,11 +438,107 @@ class Biconditional(Sentence):
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+        if self.cached_symbols is None:
+            symbols = set.union(self.left.symbols(),
+                                self.right.symbols())
+            if not self.interned:
+                return symbols
+            self.cached_symbols = symbols
+        return set(self.cached_symbols)
+
+    def compile(self, index, full):
+        left = self.left.compile(index, full)
+        right = self.right.compile(index, full)
+        return lambda values: full ^ left(values) ^ right(values)
+
+
+# Interned sentences, keyed by class and the identities of their
+# (interned) children, or by name for symbols
+interned = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """
+    Returns the shared sentence structurally equal to sentence, so that
+    equal subformulas are one object whose hash and symbols are computed
+    once. Interned sentences must not be modified.
+    """
+    if sentence.interned:
+        return sentence
+
+    if isinstance(sentence, Symbol):
+        key = (Symbol, sentence.name)
+        parts = [sentence.name]
+    elif isinstance(sentence, Not):
+        parts = [intern(sentence.operand)]
+    elif isinstance(sentence, And):
+        parts = [intern(conjunct) for conjunct in sentence.conjuncts]
+    elif isinstance(sentence, Or):
+        parts = [intern(disjunct) for disjunct in sentence.disjuncts]
+    elif isinstance(sentence, Implication):
+        parts = [intern(sentence.antecedent), intern(sentence.consequent)]
+    elif isinstance(sentence, Biconditional):
+        parts = [intern(sentence.left), intern(sentence.right)]
+    else:
+        raise TypeError("must be a logical sentence")
+    if not isinstance(sentence, Symbol):
+        key = (type(sentence),) + tuple(id(part) for part in parts)
+
+    node = interned.get(key)
+    if node is None:
+        node = type(sentence)(*parts)
+        node.interned = True
+        interned[key] = node
+    return node
 
 
 def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    """
+    Checks if knowledge base entails query, abandoning each partial
+    model as soon as it decides the knowledge base false or the query
+    true, and assigning the most frequently occurring symbols first.
+    """
+
+    def check_all(knowledge, query, symbols, model):
+        """Checks if knowledge base entails query, given a particular model."""
+
+        # Every extension of the model entails the query if knowledge base
+        # is already false or query already true, and none does if
+        # knowledge base is already true and query already false
+        known = knowledge.partial(model)
+        if known is False:
+            return True
+        entailed = query.partial(model)
+        if entailed is True:
+            return True
+        if known is True and entailed is False:
+            return False
+
+        # Assign the next symbol both ways and ensure entailment holds
+        p = symbols[len(model)]
+        for value in (True, False):
+            model[p] = value
+            if not check_all(knowledge, query, symbols, model):
+                del model[p]
+                return False
+        del model[p]
+        return True
+
+    # Order symbols in both knowledge and query by how often they occur
+    counts = collections.Counter()
+    knowledge.occurrences(counts)
+    query.occurrences(counts)
+    symbols = sorted(counts, key=lambda name: (-counts[name], name))
+
+    # Check that knowledge entails query
+    return check_all(knowledge, query, symbols, dict())
+
+
+def full_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both in every
+    complete model.
+    """
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +573,130 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+# Number of symbols whose truth assignments are packed into one word,
+# so each word tests 2 ** WORD_SYMBOLS = 64 models at once
+WORD_SYMBOLS = 6
+
+
+def model_check_bitwise(knowledge, query):
+    """
+    Checks if knowledge base entails query, like model_check, by
+    evaluating compiled sentences on 64 models per integer word.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    # The first symbols vary within a word: bit m of a word is the model
+    # in which symbol i is true exactly when bit i of m is set
+    packed = min(len(symbols), WORD_SYMBOLS)
+    width = 2 ** packed
+    full = (1 << width) - 1
+    patterns = [sum(1 << m for m in range(width) if m >> i & 1)
+                for i in range(packed)]
+
+    knowledge = knowledge.compile(index, full)
+    query = query.compile(index, full)
+
+    # The remaining symbols are constant within a word and vary per word
+    values = patterns + [0] * (len(symbols) - packed)
+    for word in range(2 ** (len(symbols) - packed)):
+        for i in range(packed, len(symbols)):
+            values[i] = full if word >> (i - packed) & 1 else 0
+        if knowledge(values) & ~query(values) & full:
+            return False
+    return True
+
+
+class ModelSet():
+    """
+    The models of a knowledge base, enumerated once so that any
+    number of queries can be checked against them.
+
+    Models are numbered 0 to count - 1, and values[i] is the mask of
+    models in which symbols[i] is true.
+    """
+
+    def __init__(self, knowledge):
+        self.symbols = sorted(knowledge.symbols())
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.values = [0] * len(self.symbols)
+        self.count = 0
+
+        packed = min(len(self.symbols), WORD_SYMBOLS)
+        width = 2 ** packed
+        full = (1 << width) - 1
+        words = [sum(1 << m for m in range(width) if m >> i & 1)
+                 for i in range(packed)]
+        words += [0] * (len(self.symbols) - packed)
+        evaluate = knowledge.compile(self.index, full)
+
+        for word in range(2 ** (len(self.symbols) - packed)):
+            for i in range(packed, len(self.symbols)):
+                words[i] = full if word >> (i - packed) & 1 else 0
+            satisfied = evaluate(words)
+
+            # Append each satisfying model as the next bit of every mask
+            while satisfied:
+                bit = satisfied & -satisfied
+                satisfied ^= bit
+                for i, symbol_word in enumerate(words):
+                    if symbol_word & bit:
+                        self.values[i] |= 1 << self.count
+                self.count += 1
+
+    def entails(self, query):
+        """
+        Checks if the knowledge base entails query. Symbols of query
+        that the knowledge base does not mention take every value
+        in every model.
+        """
+        extra = sorted(query.symbols() - set(self.symbols))
+        index = dict(self.index)
+        values = list(self.values)
+        count = self.count
+        models = (1 << count) - 1
+
+        # Repeat the models once per assignment of the extra symbols
+        for symbol in extra:
+            index[symbol] = len(values)
+            values = [value | value << count for value in values]
+            values.append(models << count)
+            count *= 2
+            models = (1 << count) - 1
+
+        full = (1 << count) - 1
+        return query.compile(index, full)(values) == full
+
+
+# Most ModelSets kept for reuse
+MODEL_SETS = 16
+
+# ModelSets keyed by an interned copy of their knowledge base, so that
+# later changes to the knowledge base cannot change the key, least
+# recently used first
+model_sets = collections.OrderedDict()
+
+
+def model_set(knowledge):
+    """
+    Returns the ModelSet of a knowledge base, reusing the one built
+    for any structurally equal knowledge base.
+    """
+    key = intern(knowledge)
+    if key in model_sets:
+        model_sets.move_to_end(key)
+    else:
+        model_sets[key] = ModelSet(key)
+        if len(model_sets) > MODEL_SETS:
+            model_sets.popitem(last=False)
+    return model_sets[key]
+
+
+def model_check_batched(knowledge, query):
+    """
+    Checks if knowledge base entails query, like model_check, against
+    the cached models of the knowledge base.
+    """
+    return model_set(knowledge).entails(query)
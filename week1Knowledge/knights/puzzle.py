@@ -1,4 +1,15 @@
+import sys
+
 from logic import *
+import sat
+
+# Entailment checkers selectable from the command line
+CHECKERS = {
+    "batched": model_check_batched,
+    "model_check": model_check,
+    "bitwise": model_check_bitwise,
+    "sat": sat.entails,
+}
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -86,6 +97,10 @@ knowledge3 = And(
 
 
 def main():
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] not in CHECKERS):
+        sys.exit(f"Usage: python puzzle.py [{'|'.join(CHECKERS)}]")
+    check = CHECKERS[sys.argv[1] if len(sys.argv) == 2 else "batched"]
+
     symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
     puzzles = [
         ("Puzzle 0", knowledge0),
@@ -99,7 +114,7 @@ def main():
             print("    Not yet implemented.")
         else:
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if check(knowledge, symbol):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,270 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Tseitin encoding of logical sentences into clauses over integer
+    variables, where a literal is +v or -v for variable v.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is true,
+        adding the clauses that define it.
+        """
+        if sentence in self.variables:
+            return self.variables[sentence]
+
+        if isinstance(sentence, Symbol):
+            result = self.new_variable()
+        elif isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        elif isinstance(sentence, And):
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            result = self.new_variable()
+            for part in parts:
+                self.clauses.append([-result, part])
+            self.clauses.append([result] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            result = self.new_variable()
+            for part in parts:
+                self.clauses.append([result, -part])
+            self.clauses.append([-result] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            result = self.new_variable()
+            self.clauses.extend([[-result, -a, b], [result, a], [result, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            result = self.new_variable()
+            self.clauses.extend([[-result, -a, b], [-result, a, -b],
+                                 [result, a, b], [result, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.variables[sentence] = result
+        return result
+
+
+class Solver():
+    """
+    CDCL SAT solver: unit propagation over two watched literals per
+    clause, first-UIP clause learning with non-chronological
+    backjumping, and activity-based decisions.
+    """
+
+    def __init__(self, count, clauses):
+        self.count = count
+        self.clauses = []
+        self.watches = {}
+
+        # Per-variable state, indexed by variable
+        self.assignment = [0] * (count + 1)
+        self.level = [0] * (count + 1)
+        self.reason = [None] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.phase = [-1] * (count + 1)
+        self.increment = 1.0
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.levels = []
+        self.head = 0
+
+        self.conflicting = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.assignment[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        clause = list(dict.fromkeys(literals))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.conflicting = True
+        elif len(clause) == 1:
+            if self.value(clause[0]) == -1:
+                self.conflicting = True
+            elif self.value(clause[0]) == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.assignment[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.levels)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a
+        conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for n, clause in enumerate(watching):
+
+                # Keep the falsified watch in position 1
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Move the watch to another literal that is not false
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watching[n + 1:])
+                        self.watches[false] = kept
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learnt clause, backjump level) for a conflict, where
+        the clause's first literal is the first unique implication point.
+        """
+        current = len(self.levels)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable in seen or self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.level[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Resolve on the most recent assigned literal in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[abs(literal)]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal from the highest remaining level second
+        highest = max(range(1, len(learnt)),
+                      key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def backjump(self, level):
+        """Undoes every assignment above decision level."""
+        if len(self.levels) <= level:
+            return
+        start = self.levels[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.assignment[variable]
+            self.assignment[variable] = 0
+            self.reason[variable] = None
+        del self.trail[start:]
+        del self.levels[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity,
+        or None if every variable is assigned.
+        """
+        best = None
+        for variable in range(1, self.count + 1):
+            if self.assignment[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self):
+        """Returns True if the clauses are satisfiable, False otherwise."""
+        if self.conflicting:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.levels:
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watch(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment *= 1.05
+            else:
+                variable = self.decide()
+                if variable is None:
+                    return True
+                self.levels.append(len(self.trail))
+                self.assign(variable * self.phase[variable], None)
+
+
+def satisfiable(sentence):
+    """Checks if some model makes sentence true."""
+    cnf = CNF()
+    cnf.clauses.append([cnf.literal(sentence)])
+    return Solver(cnf.count, cnf.clauses).solve()
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that
+    knowledge ∧ ¬query is unsatisfiable.
+    """
+    return not satisfiable(And(knowledge, Not(query)))
@@ -0,0 +1,59 @@
+"""
+NumPy-backed Minesweeper board
+
+Mines are sampled without replacement in one call, and the number of
+neighbouring mines of every cell is computed once by summing the eight
+shifted copies of the padded mine grid, so nearby_mines is a lookup.
+"""
+
+import random
+
+import numpy as np
+
+from minesweeper import Minesweeper
+
+
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper game representation with its board stored in arrays
+    """
+
+    def __init__(self, height=8, width=8, mines=8, rng=None) -> None:
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+
+        # Draw from the random module by default, so random.seed still
+        # reproduces a board
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+
+        # Add mines at distinct random positions
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board = np.zeros(height * width, dtype=bool)
+        self.board[positions] = True
+        self.board = self.board.reshape(height, width)
+        self.mines = {divmod(int(p), width) for p in positions}
+
+        # Count the mines around every cell from the padded board
+        padded = np.pad(self.board, 1).astype(np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in (0, 1, 2):
+            for dj in (0, 1, 2):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+    def is_mine(self, cell) -> bool:
+        return bool(self.board[cell])
+
+    def nearby_mines(self, cell) -> int:
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        return int(self.counts[cell])
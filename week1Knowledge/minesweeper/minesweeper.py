@@ -1,5 +1,8 @@
 import itertools
 import random
+from collections import deque
+
+import probability
 
 
 class Minesweeper():
@@ -98,6 +101,9 @@ class Sentence():
     def __eq__(self, other) -> bool:
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self) -> int:
+        return hash((frozenset(self.cells), self.count))
+
     def __str__(self) -> str:
         return f"{self.cells} = {self.count}"
 
@@ -139,17 +145,123 @@ class Sentence():
             self.cells.remove(cell)
 
 
+class MaskSentence():
+    """
+    Logical statement about a Minesweeper game
+    stored as an integer mask whose bit k is the cell at position
+    base + k, and a count of the number of those cells which are mines.
+    The mask is kept shifted so that its lowest bit is set, which keeps
+    it as short as the span of its cells on large boards.
+    """
+
+    __slots__ = ("base", "mask", "count")
+
+    def __init__(self, base, mask, count) -> None:
+        self.base = base
+        self.mask = mask
+        self.count = count
+        self.normalize()
+
+    def __eq__(self, other) -> bool:
+        return (self.base == other.base and self.mask == other.mask
+                and self.count == other.count)
+
+    def __hash__(self) -> int:
+        return hash((self.base, self.mask, self.count))
+
+    def __str__(self) -> str:
+        return f"{list(self.bits())} = {self.count}"
+
+    def normalize(self) -> None:
+        """
+        Shifts the mask so that its lowest bit is set.
+        """
+        if self.mask:
+            low = (self.mask & -self.mask).bit_length() - 1
+            self.base += low
+            self.mask >>= low
+
+    def bits(self):
+        """
+        Yields the position of every cell in the sentence.
+        """
+        for bit in bits(self.mask):
+            yield self.base + bit
+
+    def issubset(self, other) -> bool:
+        """
+        Returns True if every cell in the sentence is also in other.
+        """
+        shift = self.base - other.base
+        return shift >= 0 and (self.mask << shift) & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells not in other, a subset.
+        """
+        return MaskSentence(
+            self.base, self.mask & ~(other.mask << (other.base - self.base)),
+            self.count - other.count
+        )
+
+    def known_mines(self) -> list:
+        """
+        Returns the positions of all cells known to be mines.
+        """
+        if self.count != 0 and bin(self.mask).count("1") == self.count:
+            return list(self.bits())
+        return []
+
+    def known_safes(self) -> list:
+        """
+        Returns the positions of all cells known to be safe.
+        """
+        if self.count == 0:
+            return list(self.bits())
+        return []
+
+    def mark_mine(self, bit) -> None:
+        """
+        Updates the sentence given the fact that the cell at bit is a mine.
+        """
+        if bit >= self.base and self.mask >> (bit - self.base) & 1:
+            self.mask ^= 1 << (bit - self.base)
+            self.count -= 1
+            self.normalize()
+
+    def mark_safe(self, bit) -> None:
+        """
+        Updates the sentence given the fact that the cell at bit is safe.
+        """
+        if bit >= self.base and self.mask >> (bit - self.base) & 1:
+            self.mask ^= 1 << (bit - self.base)
+            self.normalize()
+
+
+def bits(mask):
+    """
+    Yields the position of every set bit in mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8) -> None:
+    def __init__(self, height=8, width=8, mines=None) -> None:
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.mine_count = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -157,8 +269,14 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of distinct sentences about the game known to be true
+        self.knowledge = set()
+
+        # Sentences in knowledge containing each cell
+        self.index = {}
+
+        # Sentences added or changed since they were last examined
+        self.pending = deque()
 
     def mark_mine(self, cell) -> None:
         """
@@ -166,8 +284,10 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.index.pop(cell, ()):
+            self.remove_sentence(sentence)
             sentence.mark_mine(cell)
+            self.add_sentence(sentence)
 
     def mark_safe(self, cell) -> None:
         """
@@ -175,8 +295,40 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.index.pop(cell, ()):
+            self.remove_sentence(sentence)
             sentence.mark_safe(cell)
+            self.add_sentence(sentence)
+
+    def sentence(self, cells, count):
+        """
+        Returns a sentence stating that count of cells are mines.
+        """
+        return Sentence(cells, count)
+
+    def add_sentence(self, sentence) -> None:
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        already known, and queues it to be examined.
+        """
+        if not sentence.cells or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.index.setdefault(cell, set()).add(sentence)
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence) -> None:
+        """
+        Removes a sentence from the knowledge base, before it changes.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.index.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.index[cell]
 
     def add_knowledge(self, cell, count) -> None:
         """
@@ -223,62 +375,59 @@ class MinesweeperAI():
                         cells.add((i, j))
 
         # Add the new sentence
-        new_sentence = Sentence(cells, count)
-        self.knowledge.append(new_sentence)
-
-        # 4 & 5) Iteratively infer new knowledge
-
-        # loop until no new changes are made to ensure cascading inferences are caught
-        while True:
-            changes = False
-
-            # Clean up empty sentences
-            self.knowledge = [s for s in self.knowledge if len(s.cells) > 0]
+        self.add_sentence(self.sentence(cells, count))
 
-            # Check for known mines and safes in existing sentences
-            safes_to_mark = set()
-            mines_to_mark = set()
+        # 4 & 5) Infer new knowledge from every sentence that was added
+        # or changed, until none are left to examine
+        self.infer()
 
-            for sentence in self.knowledge:
-                safes_to_mark.update(sentence.known_safes())
-                mines_to_mark.update(sentence.known_mines())
-
-            # Apply markings (outside loop to avoid modifying collection while iterating)
-            if safes_to_mark:
-                for safe in safes_to_mark:
-                    if safe not in self.safes:
-                        self.mark_safe(safe)
-                        changes = True
-
-            if mines_to_mark:
-                for mine in mines_to_mark:
+    def infer(self) -> None:
+        """
+        Examines queued sentences, marking the cells they decide and
+        adding the differences with the sentences they are a subset
+        or superset of. Only sentences sharing a cell are compared, so
+        the work done follows what changed rather than the size of
+        the knowledge base.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+
+            # Skip sentences that have since been removed or changed
+            if sentence not in self.knowledge:
+                continue
+
+            # Mark cells the sentence decides, which requeues every
+            # sentence containing them
+            mines = sentence.known_mines()
+            if mines:
+                for mine in list(mines):
                     if mine not in self.mines:
                         self.mark_mine(mine)
-                        changes = True
+                continue
+            safes = sentence.known_safes()
+            if safes:
+                for safe in list(safes):
+                    if safe not in self.safes:
+                        self.mark_safe(safe)
+                continue
 
-            # Infer new sentences via subsets
             # If set1 is a subset of set2, then (set2 - set1) = count2 - count1
-            new_sentences = []
-            for s1 in self.knowledge:
-                for s2 in self.knowledge:
-                    if s1 == s2:
-                        continue
-
-                    if s1.cells.issubset(s2.cells):
-                        diff_cells = s2.cells - s1.cells
-                        diff_count = s2.count - s1.count
-
-                        if len(diff_cells) > 0:
-                            new_s = Sentence(diff_cells, diff_count)
-                            if new_s not in self.knowledge and new_s not in new_sentences:
-                                new_sentences.append(new_s)
-                                changes = True
-
-            self.knowledge.extend(new_sentences)
-
-            # If no changes occurred in this pass, break the loop
-            if not changes:
-                break
+            # Supersets contain every cell, so scan the rarest cell's sentences
+            rarest = min(sentence.cells, key=lambda c: len(self.index[c]))
+            for other in list(self.index[rarest]):
+                if sentence.cells < other.cells:
+                    self.add_sentence(Sentence(other.cells - sentence.cells,
+                                               other.count - sentence.count))
+
+            # Subsets share a cell with the sentence
+            subsets = set()
+            for c in sentence.cells:
+                for other in self.index[c]:
+                    if other.cells < sentence.cells:
+                        subsets.add(other)
+            for other in subsets:
+                self.add_sentence(Sentence(sentence.cells - other.cells,
+                                           sentence.count - other.count))
 
     def make_safe_move(self) -> tuple:
         """
@@ -314,3 +463,177 @@ class MinesweeperAI():
             return random.choice(available_moves)
         else:
             return None
+
+    def constraints(self) -> list:
+        """
+        Returns the knowledge base as a list of (cells, count).
+        """
+        return [(sentence.cells, sentence.count)
+                for sentence in self.knowledge]
+
+    def make_guess_move(self, time_limit=1.0) -> tuple:
+        """
+        Returns a move to make on the Minesweeper board.
+        Chooses among cells that have not already been chosen and are
+        not known to be mines: a known safe cell if there is one, and
+        otherwise the cell least likely to be a mine, spending about
+        time_limit seconds on working out the probabilities.
+        """
+        available_moves = []
+        for i in range(self.height):
+            for j in range(self.width):
+                cell = (i, j)
+                if cell not in self.moves_made and cell not in self.mines:
+                    if cell in self.safes:
+                        return cell
+                    available_moves.append(cell)
+        if not available_moves:
+            return None
+
+        mines = (None if self.mine_count is None
+                 else self.mine_count - len(self.mines))
+        probabilities = probability.mine_probabilities(
+            self.constraints(), available_moves, mines, time_limit
+        )
+        lowest = min(probabilities.values())
+        return random.choice([cell for cell in available_moves
+                              if probabilities[cell] <= lowest + 1e-9])
+
+
+class MaskMinesweeperAI(MinesweeperAI):
+    """
+    Minesweeper game player that stores its knowledge as MaskSentences,
+    with cell (i, j) at position i * width + j, for large boards
+    """
+
+    def __init__(self, height=8, width=8, mines=None) -> None:
+        super().__init__(height, width, mines)
+
+        # Cells found to be safe, in order, some of which may have been played
+        self.safe_moves = deque()
+
+    def bit(self, cell) -> int:
+        return cell[0] * self.width + cell[1]
+
+    def cell(self, bit) -> tuple:
+        return divmod(bit, self.width)
+
+    def mark_mine(self, cell) -> None:
+        """
+        Marks a cell as a mine, and updates all knowledge
+        to mark that cell as a mine as well.
+        """
+        self.mines.add(cell)
+        bit = self.bit(cell)
+        for sentence in self.index.pop(bit, ()):
+            self.remove_sentence(sentence)
+            sentence.mark_mine(bit)
+            self.add_sentence(sentence)
+
+    def mark_safe(self, cell) -> None:
+        """
+        Marks a cell as safe, and updates all knowledge
+        to mark that cell as safe as well.
+        """
+        self.safes.add(cell)
+        self.safe_moves.append(cell)
+        bit = self.bit(cell)
+        for sentence in self.index.pop(bit, ()):
+            self.remove_sentence(sentence)
+            sentence.mark_safe(bit)
+            self.add_sentence(sentence)
+
+    def constraints(self) -> list:
+        """
+        Returns the knowledge base as a list of (cells, count).
+        """
+        return [({self.cell(bit) for bit in sentence.bits()}, sentence.count)
+                for sentence in self.knowledge]
+
+    def sentence(self, cells, count):
+        """
+        Returns a sentence stating that count of cells are mines.
+        """
+        positions = [self.bit(cell) for cell in cells]
+        base = min(positions, default=0)
+        mask = 0
+        for bit in positions:
+            mask |= 1 << (bit - base)
+        return MaskSentence(base, mask, count)
+
+    def add_sentence(self, sentence) -> None:
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        already known, and queues it to be examined.
+        """
+        if not sentence.mask or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for bit in sentence.bits():
+            self.index.setdefault(bit, set()).add(sentence)
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence) -> None:
+        """
+        Removes a sentence from the knowledge base, before it changes.
+        """
+        self.knowledge.discard(sentence)
+        for bit in sentence.bits():
+            sentences = self.index.get(bit)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.index[bit]
+
+    def infer(self) -> None:
+        """
+        Examines queued sentences like MinesweeperAI.infer, testing
+        subsets with MaskSentence.issubset.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+
+            # Skip sentences that have since been removed or changed
+            if sentence not in self.knowledge:
+                continue
+
+            # Mark cells the sentence decides
+            mines = sentence.known_mines()
+            if mines:
+                for bit in mines:
+                    if self.cell(bit) not in self.mines:
+                        self.mark_mine(self.cell(bit))
+                continue
+            safes = sentence.known_safes()
+            if safes:
+                for bit in safes:
+                    if self.cell(bit) not in self.safes:
+                        self.mark_safe(self.cell(bit))
+                continue
+
+            # Supersets contain every cell, so scan the rarest cell's sentences
+            cells = (sentence.base, sentence.mask)
+            rarest = min(sentence.bits(), key=lambda b: len(self.index[b]))
+            for other in list(self.index[rarest]):
+                if ((other.base, other.mask) != cells
+                        and sentence.issubset(other)):
+                    self.add_sentence(other.difference(sentence))
+
+            # Subsets share a cell with the sentence
+            subsets = set()
+            for bit in sentence.bits():
+                for other in self.index[bit]:
+                    if ((other.base, other.mask) != cells
+                            and other.issubset(sentence)):
+                        subsets.add(other)
+            for other in subsets:
+                self.add_sentence(sentence.difference(other))
+
+    def make_safe_move(self) -> tuple:
+        """
+        Returns a safe cell to choose on the Minesweeper board, like
+        MinesweeperAI.make_safe_move, without scanning every safe cell.
+        """
+        while self.safe_moves and self.safe_moves[0] in self.moves_made:
+            self.safe_moves.popleft()
+        return self.safe_moves[0] if self.safe_moves else None
@@ -0,0 +1,285 @@
+"""
+Mine probabilities for Minesweeper guesses
+
+The unknown cells mentioned by the AI's sentences (the frontier) are
+split into components that share no sentence. The consistent mine
+assignments of each component are counted exactly, grouped by their
+number of mines, by a search memoized on the counts its open sentences
+still need; components too large or too slow to count are sampled
+instead. Components are then combined with the cells no sentence
+mentions, weighting every total number of frontier mines by the number
+of ways to place the remaining mines among those cells.
+"""
+
+import math
+import random
+import time
+
+# Components with more cells than this are sampled instead of counted
+EXACT_CELLS = 64
+
+# Most consistent assignments drawn from a sampled component
+SAMPLES = 200
+
+# Assignments drawn from a sampled component even past its deadline
+MIN_SAMPLES = 20
+
+
+class CountTimeout(Exception):
+    """Raised when counting a component runs past its deadline."""
+
+
+def components(constraints) -> list:
+    """
+    Splits constraints, a list of (cells, count), into groups that
+    share no cell, returning (cells in row-major order, constraints)
+    for each group.
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, count in constraints:
+        cells = list(cells)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        for cell in cells[1:]:
+            a, b = find(cells[0]), find(cell)
+            if a != b:
+                parent[a] = b
+
+    groups = {}
+    for cells, count in constraints:
+        if cells:
+            root = find(next(iter(cells)))
+            groups.setdefault(root, []).append((cells, count))
+
+    return [(sorted(set().union(*[cells for cells, _ in group])), group)
+            for group in groups.values()]
+
+
+def stepper(cells, constraints):
+    """
+    Returns a function step(position, remaining, value) that assigns
+    value (1 for a mine) to cells[position], given remaining, the mines
+    still needed by each constraint that has started but not finished.
+    It returns the updated remaining counts, or None if some constraint
+    can no longer be met.
+    """
+    position = {cell: n for n, cell in enumerate(cells)}
+    counts = [count for _, count in constraints]
+
+    # Constraints containing each position, with how many of their cells
+    # come after it
+    members = [[] for _ in cells]
+    for c, (group_cells, _) in enumerate(constraints):
+        positions = sorted(position[cell] for cell in group_cells)
+        for n, p in enumerate(positions):
+            members[p].append((c, len(positions) - n - 1))
+
+    def step(p, remaining, value):
+        remaining = dict(remaining)
+        for c, after in members[p]:
+            left = remaining.get(c, counts[c]) - value
+            if left < 0 or left > after:
+                return None
+            if after:
+                remaining[c] = left
+            else:
+                remaining.pop(c, None)
+        return remaining
+
+    return step
+
+
+def count_component(cells, constraints, deadline) -> dict:
+    """
+    Returns {mines: [ways, ways per cell]} for a component: the number
+    of consistent assignments placing that many mines, and for each
+    cell the number of those assignments that make it a mine.
+    """
+    n = len(cells)
+    step = stepper(cells, constraints)
+    memo = {}
+
+    def count(p, remaining):
+        if p == n:
+            return {0: [1, []]}
+        key = (p, tuple(sorted(remaining.items())))
+        if key in memo:
+            return memo[key]
+        if time.perf_counter() > deadline:
+            raise CountTimeout
+
+        result = {}
+        for value in (0, 1):
+            following = step(p, remaining, value)
+            if following is None:
+                continue
+            for mines, (ways, cell_ways) in count(p + 1, following).items():
+                entry = result.setdefault(mines + value, [0, [0] * (n - p)])
+                entry[0] += ways
+                entry[1][0] += ways * value
+                total = entry[1]
+                for k, w in enumerate(cell_ways, 1):
+                    total[k] += w
+        memo[key] = result
+        return result
+
+    return count(0, {})
+
+
+def sample_component(cells, constraints, deadline, rng) -> dict:
+    """
+    Returns the same summary as count_component from up to SAMPLES
+    consistent assignments, each found by a randomized depth-first
+    search, drawing at least MIN_SAMPLES whatever the deadline. The
+    samples are not exactly uniform.
+    """
+    n = len(cells)
+    step = stepper(cells, constraints)
+    result = {}
+    for drawn in range(SAMPLES):
+        if drawn >= MIN_SAMPLES and time.perf_counter() > deadline:
+            break
+
+        # Assign cells in order, backtracking on dead ends
+        assignment = []
+        states = [{}]
+        options = [rng.sample((0, 1), 2)]
+        while len(assignment) < n:
+            if not options[-1]:
+                options.pop()
+                states.pop()
+                if not assignment or (drawn >= MIN_SAMPLES
+                                      and time.perf_counter() > deadline):
+                    return result
+                assignment.pop()
+                continue
+            value = options[-1].pop()
+            following = step(len(assignment), states[-1], value)
+            if following is not None:
+                assignment.append(value)
+                states.append(following)
+                options.append(rng.sample((0, 1), 2))
+
+        entry = result.setdefault(sum(assignment), [0, [0] * n])
+        entry[0] += 1
+        for k, value in enumerate(assignment):
+            entry[1][k] += value
+    return result
+
+
+def convolve(a, b) -> dict:
+    """
+    Returns the product of two polynomials stored as {power: coefficient}.
+    """
+    result = {}
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] = result.get(i + j, 0) + x * y
+    return result
+
+
+def mine_probabilities(constraints, cells, mines=None, time_limit=1.0,
+                       rng=random) -> dict:
+    """
+    Returns the probability that each of cells, the unknown cells, is a
+    mine, given constraints, a list of (cells, count) about them, and
+    the number of mines among them if known. Without a mine count, cells
+    outside every constraint take the frontier's average probability.
+    """
+    deadline = time.perf_counter() + time_limit
+    groups = components(constraints)
+
+    # Summarize every component, splitting the time left between them
+    # and leaving half of each share for sampling if counting runs out
+    summaries = []
+    frontier = set()
+    estimates = {}
+    for n, (group_cells, group) in enumerate(groups):
+        now = time.perf_counter()
+        share = max(deadline - now, 0) / (len(groups) - n)
+        try:
+            if len(group_cells) > EXACT_CELLS:
+                raise CountTimeout
+            summary = count_component(group_cells, group, now + share / 2)
+        except CountTimeout:
+            summary = sample_component(group_cells, group, now + share, rng)
+        if summary:
+            summaries.append((group_cells, summary))
+            frontier.update(group_cells)
+            continue
+
+        # No consistent assignment was found, so estimate each cell from
+        # the mine density of the sentences about it rather than treat
+        # it as unconstrained
+        densities = {}
+        for sentence_cells, count in group:
+            for cell in sentence_cells:
+                densities.setdefault(cell, []).append(
+                    min(max(count / len(sentence_cells), 0), 1))
+        for cell in group_cells:
+            estimates[cell] = sum(densities[cell]) / len(densities[cell])
+    if mines is not None and estimates:
+        mines = max(mines - round(sum(estimates.values())), 0)
+    others = [cell for cell in cells
+              if cell not in frontier and cell not in estimates]
+
+    probabilities = dict(estimates)
+    polynomials = [{k: ways for k, (ways, _) in summary.items()}
+                   for _, summary in summaries]
+
+    # Ways to place the remaining mines outside the frontier, given how
+    # many the frontier holds
+    def weight(s):
+        if mines is None:
+            return 1
+        rest = mines - s
+        return math.comb(len(others), rest) if 0 <= rest <= len(others) else 0
+
+    # Products of the component polynomials before and after each one
+    prefix = [{0: 1}]
+    for polynomial in polynomials:
+        prefix.append(convolve(prefix[-1], polynomial))
+    suffix = [{0: 1}]
+    for polynomial in reversed(polynomials):
+        suffix.append(convolve(suffix[-1], polynomial))
+    suffix.reverse()
+
+    # No placement fits the mine count, which sampling can cause, so
+    # fall back to ignoring it
+    total = sum(ways * weight(s) for s, ways in prefix[-1].items())
+    if total == 0:
+        return mine_probabilities(constraints, cells, None,
+                                  max(deadline - time.perf_counter(), 0), rng)
+
+    expected = 0
+    for n, (group_cells, summary) in enumerate(summaries):
+        rest = convolve(prefix[n], suffix[n + 1])
+        cell_ways = [0] * len(group_cells)
+        for k, (_, mine_ways) in summary.items():
+            w = sum(ways * weight(k + j) for j, ways in rest.items())
+            for i, ways in enumerate(mine_ways):
+                cell_ways[i] += ways * w
+        for cell, ways in zip(group_cells, cell_ways):
+            probabilities[cell] = ways / total
+            expected += probabilities[cell]
+
+    if others:
+        if mines is not None:
+            outside = sum(ways * weight(s) * (mines - s)
+                          for s, ways in prefix[-1].items())
+            probability = outside / (total * len(others))
+        elif frontier:
+            probability = expected / len(frontier)
+        else:
+            probability = 0.5
+        for cell in others:
+            probabilities[cell] = probability
+
+    return {cell: probabilities[cell] for cell in cells}
@@ -1,6 +1,6 @@
 import pygame
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 from minesweeper import Minesweeper, MinesweeperAI
 
@@ -39,7 +39,7 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
@@ -49,12 +49,27 @@ lost = False
 # Show instructions initially
 instructions = True
 
+clock = pygame.time.Clock()
+
+# AI inference runs on one background thread, so updates apply in order;
+# thinking is the future of the latest update and ai_requested records an
+# AI Move click that waits for it
+executor = ThreadPoolExecutor(max_workers=1)
+thinking = None
+ai_requested = False
+
 while True:
 
-    # Check if game quit
+    # Check if game quit, and handle each mouse click once
+    left = right = None
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                left = event.pos
+            elif event.button == 3:
+                right = event.pos
 
     screen.fill(BLACK)
 
@@ -88,14 +103,11 @@ while True:
         screen.blit(buttonText, buttonTextRect)
 
         # Check if play button clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if buttonRect.collidepoint(mouse):
-                instructions = False
-                time.sleep(0.3)
+        if left is not None and buttonRect.collidepoint(left):
+            instructions = False
 
         pygame.display.flip()
+        clock.tick(60)
         continue
 
     # Draw board
@@ -153,7 +165,9 @@ while True:
     screen.blit(buttonText, buttonRect)
 
     # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    busy = thinking is not None and not thinking.done()
+    text = ("Lost" if lost else "Won" if game.mines == flags
+            else "Thinking..." if busy else "")
     text = mediumFont.render(text, True, WHITE)
     textRect = text.get_rect()
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
@@ -161,62 +175,67 @@ while True:
 
     move = None
 
-    left, _, right = pygame.mouse.get_pressed()
-
     # Check for a right-click to toggle flagging
-    if right == 1 and not lost:
-        mouse = pygame.mouse.get_pos()
+    if right is not None and not lost:
         for i in range(HEIGHT):
             for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
+                if cells[i][j].collidepoint(right) and (i, j) not in revealed:
                     if (i, j) in flags:
                         flags.remove((i, j))
                     else:
                         flags.add((i, j))
-                    time.sleep(0.2)
 
-    elif left == 1:
-        mouse = pygame.mouse.get_pos()
+    elif left is not None:
 
-        # If AI button clicked, make an AI move
-        if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
-            time.sleep(0.2)
+        # If AI button clicked, make an AI move once inference catches up
+        if aiButton.collidepoint(left) and not lost:
+            ai_requested = True
 
         # Reset game state
-        elif resetButton.collidepoint(mouse):
+        elif resetButton.collidepoint(left):
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+            ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
             revealed = set()
             flags = set()
             lost = False
+            thinking = None
+            ai_requested = False
             continue
 
         # User-made move
         elif not lost:
             for i in range(HEIGHT):
                 for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
+                    if (cells[i][j].collidepoint(left)
                             and (i, j) not in flags
                             and (i, j) not in revealed):
                         move = (i, j)
 
-    # Make move and update AI knowledge
+    # Make the requested AI move once no inference is pending
+    if (move is None and ai_requested and not lost
+            and (thinking is None or thinking.done())):
+        if thinking is not None:
+            thinking.result()
+        ai_requested = False
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_guess_move()
+            if move is None:
+                flags = ai.mines.copy()
+                print("No moves left to make.")
+            else:
+                print("No known safe moves, AI guessing least likely mine.")
+        else:
+            print("AI making safe move.")
+
+    # Make move and update AI knowledge in the background
     if move:
         if game.is_mine(move):
             lost = True
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            thinking = executor.submit(ai.add_knowledge, move, nearby)
 
     pygame.display.flip()
+    clock.tick(60)
@@ -0,0 +1,168 @@
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI, MaskMinesweeperAI
+
+# AI players as (class, whether to guess by mine probability rather
+# than at random when no safe move is known)
+PLAYERS = {
+    "random": (MinesweeperAI, False),
+    "guess": (MinesweeperAI, True),
+    "mask": (MaskMinesweeperAI, True),
+}
+
+# Number of points in the reported knowledge base size series
+SERIES_POINTS = 20
+
+
+def play_game(task) -> dict:
+    """
+    Plays one game through the Minesweeper and MinesweeperAI API and
+    returns its result, the latency of every add_knowledge call and
+    the knowledge base size after each move.
+    """
+    player, array_board, height, width, mines, seed = task
+    ai_class, guess = PLAYERS[player]
+    if array_board:
+        # Only import NumPy when the array board is asked for
+        from arrayboard import ArrayMinesweeper as board_class
+    else:
+        board_class = Minesweeper
+
+    # Seed the global generator both the board and the AI draw from
+    random.seed(seed)
+    game = board_class(height=height, width=width, mines=mines)
+    ai = ai_class(height=height, width=width, mines=mines)
+    latencies = []
+    knowledge = []
+    won = False
+    start = time.perf_counter()
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_guess_move() if guess else ai.make_random_move()
+            if move is None:
+                won = ai.mines == game.mines
+                break
+        if game.is_mine(move):
+            break
+        nearby = game.nearby_mines(move)
+        begin = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        latencies.append(time.perf_counter() - begin)
+        knowledge.append(len(ai.knowledge))
+        if len(ai.moves_made) == height * width - mines:
+            won = True
+            break
+    return {
+        "won": won,
+        "moves": len(latencies) + (0 if won else 1),
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+        "knowledge": knowledge,
+    }
+
+
+def percentiles(samples) -> dict:
+    """
+    Returns p50/p90/p99 of samples, in milliseconds.
+    """
+    if len(samples) < 2:
+        return {f"p{p}_ms": sample * 1000
+                for p in (50, 90, 99) for sample in samples}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {f"p{p}_ms": cuts[p - 1] * 1000 for p in (50, 90, 99)}
+
+
+def knowledge_series(games) -> list:
+    """
+    Returns [move, mean knowledge base size] at SERIES_POINTS evenly
+    spaced moves, averaged over the games still running at that move.
+    """
+    longest = max((len(game["knowledge"]) for game in games), default=0)
+    step = max(longest // SERIES_POINTS, 1)
+    series = []
+    for move in range(0, longest, step):
+        sizes = [game["knowledge"][move] for game in games
+                 if move < len(game["knowledge"])]
+        series.append([move + 1, sum(sizes) / len(sizes)])
+    return series
+
+
+def main() -> None:
+    # --array plays on the NumPy-backed board from arrayboard.py
+    args = [arg for arg in sys.argv[1:] if arg != "--array"]
+    array_board = len(args) < len(sys.argv) - 1
+    if len(args) not in (5, 6) or args[4] not in PLAYERS:
+        sys.exit("Usage: python simulate.py [--array] games height width "
+                 f"mines {{{','.join(PLAYERS)}}} [output.json]")
+    games, height, width, mines = (int(arg) for arg in args[:4])
+    player = args[4]
+    output = args[5] if len(args) == 6 else None
+    if mines >= height * width:
+        sys.exit("Too many mines for the board")
+
+    # Seed every game from its number so runs are reproducible
+    tasks = [(player, array_board, height, width, mines, n)
+             for n in range(games)]
+
+    processes = os.cpu_count() or 1
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        games_played = pool.map(play_game, tasks,
+                                chunksize=max(games // (processes * 8), 1))
+    elapsed = time.perf_counter() - start
+
+    latencies = [t for game in games_played for t in game["latencies"]]
+    sizes = [size for game in games_played for size in game["knowledge"]]
+    moves = sum(game["moves"] for game in games_played)
+    wins = sum(game["won"] for game in games_played)
+    playing = sum(game["seconds"] for game in games_played)
+
+    report = {
+        "player": player,
+        "board": "array" if array_board else "list",
+        "games": games,
+        "height": height,
+        "width": width,
+        "mines": mines,
+        "processes": processes,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seconds": elapsed,
+        "wins": wins,
+        "win_rate": wins / games if games else 0,
+        "moves": moves,
+        "moves_per_sec": moves / playing if playing else 0,
+        "add_knowledge_latency": percentiles(latencies),
+        "knowledge_size": {
+            "mean": sum(sizes) / len(sizes) if sizes else 0,
+            "max": max(sizes, default=0),
+            "by_move": knowledge_series(games_played),
+        },
+    }
+
+    print(f"{games} {height}x{width} games with {mines} mines, "
+          f"{player} player, {report['board']} board, in {elapsed:.2f}s")
+    print(f"Won {wins} ({report['win_rate']:.1%}), "
+          f"{report['moves_per_sec']:.0f} moves/sec per process")
+    print("add_knowledge latency: " + ", ".join(
+        f"{name} {value:.3f}"
+        for name, value in report["add_knowledge_latency"].items()
+    ))
+    print(f"Knowledge base size: mean {report['knowledge_size']['mean']:.1f}, "
+          f"max {report['knowledge_size']['max']}")
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()